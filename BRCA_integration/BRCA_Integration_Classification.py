@@ -1,6 +1,10 @@
+import csv
+import json
+import os
+import numpy as np
 import pandas as pd
+from itertools import chain
 from time import sleep
-import math
 
 #file_path = "table_class.xlsx"
 #sheet_name = "Sheet2"
@@ -10,73 +14,114 @@ import math
 #sheet_name = "Sheet2"
 #df2 = pd.read_excel(file_path2, sheet_name=sheet_name, engine="openpyxl")
 
-def count_categories(arrays):
-    categories = {
-        'bs3': 0,
-        'bs3_moderate': 0,
-        'bs3_supporting': 0,
-        'ps3': 0,
-        'ps3_moderate': 0,
-        'ps3_supporting': 0,
-        'discordant': 0,
-        'hypomorph': 0,
-        'not_classified': 0
+# Functional evidence codes, in the order count_categories ranks them
+EVIDENCE_CODES = ['BS3', 'BS3_moderate', 'BS3_supporting', 'PS3', 'PS3_moderate', 'PS3_supporting', 'hypomorph']
+
+CATEGORIES = ['bs3', 'bs3_moderate', 'bs3_supporting', 'ps3', 'ps3_moderate', 'ps3_supporting',
+              'discordant', 'hypomorph', 'not_classified']
+
+def encode_evidence(arrays):
+    # Flatten every variant's evidence list and factorize the calls (NaN entries get code -1)
+    lengths = np.fromiter(map(len, arrays), dtype=np.int64, count=len(arrays))
+    rows = np.repeat(np.arange(len(arrays)), lengths)
+    codes, uniques = pd.factorize(pd.Series(list(chain.from_iterable(arrays)), dtype=object))
+    called = codes >= 0
+
+    # Known codes first, then any other evidence string seen in the table
+    vocabulary = EVIDENCE_CODES + [item for item in uniques if item not in EVIDENCE_CODES]
+    codes = pd.Index(vocabulary).get_indexer(uniques)[codes[called]]
+    rows = rows[called]
+
+    # Variants x codes matrix of how many times each code was called for the variant
+    size = len(vocabulary)
+    matrix = np.bincount(rows * size + codes, minlength=len(arrays) * size).reshape(len(arrays), size)
+    return matrix, vocabulary
+
+def validate_ratios(var1, var2):
+    # Array version of the is_valid_ratio test: 1 when var1 has at least 3 times the calls of var2,
+    # 2 when var2 has at least 3 times the calls of var1, 0 when indeterminate (or either is zero)
+    var1 = np.asarray(var1)
+    var2 = np.asarray(var2)
+    nonzero = (var1 != 0) & (var2 != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_wins = nonzero & (var1 / var2 >= 3/1)
+        second_wins = nonzero & ~first_wins & (var2 / var1 >= 3/1)
+    return np.where(first_wins, 1, np.where(second_wins, 2, 0))
+
+# (label, class1, class2) of the discordant outcomes of check_discordance, then the concordant labels
+DISCORDANT_OUTCOMES = [('Discordant', 'Benign', 'Pathogenic'),
+                       ('Hypomorph', 'Benign', 'Hypomorph'),
+                       ('Hypomorph', 'Pathogenic', 'Hypomorph')]
+CONCORDANT_OUTCOMES = ['Benign', 'Pathogenic', 'Hypomorph']
+
+def format_discordance(outcome, var1, var2):
+    if outcome < 3:
+        label, class1, class2 = DISCORDANT_OUTCOMES[outcome]
+        return f'{label}:Discordant:{is_valid_ratio(var1, var2, class1, class2)}'
+    elif outcome < 6:
+        return f'{CONCORDANT_OUTCOMES[outcome - 3]}:Concordant:{var1}:-:-'
+    else:
+        return 'indeterminate:indeterminate:-:-:-'
+
+def classify_evidence(arrays):
+    matrix, vocabulary = encode_evidence(arrays)
+    vocabulary = pd.Series(vocabulary, dtype=object).astype(str)
+
+    # Calls containing 'BS3', 'PS3' or 'hypomorph', and exact 'hypomorph' calls
+    bs3_count = matrix @ vocabulary.str.contains('BS3').to_numpy(dtype=np.int64)
+    ps3_count = matrix @ vocabulary.str.contains('PS3').to_numpy(dtype=np.int64)
+    hypomorph_count = matrix @ vocabulary.str.contains('hypomorph').to_numpy(dtype=np.int64)
+    bs3_present = bs3_count > 0
+    ps3_present = ps3_count > 0
+    hypomorph_present = matrix[:, EVIDENCE_CODES.index('hypomorph')] > 0
+
+    # Outcome of check_discordance (index into DISCORDANT_OUTCOMES, then CONCORDANT_OUTCOMES, 6 = indeterminate)
+    conditions = [
+        bs3_present & ps3_present,
+        bs3_present & hypomorph_present,
+        ps3_present & hypomorph_present,
+        bs3_present,
+        ps3_present,
+        hypomorph_present,
+    ]
+    outcome = np.select(conditions, range(6), 6)
+    var1 = np.select(conditions, [bs3_count, bs3_count, ps3_count, bs3_count, ps3_count, hypomorph_count], 0)
+    var2 = np.select(conditions[:3], [ps3_count, hypomorph_count, hypomorph_count], 0)
+    ratio = np.where(outcome < 3, validate_ratios(var1, var2), 0)
+
+    # Format each distinct (outcome, var1, var2) once and broadcast the labels back to the variants
+    base = int(max(var1.max(initial=0), var2.max(initial=0))) + 1
+    keys, combinations = pd.factorize((outcome * base + var1) * base + var2)
+    labels = np.array([format_discordance(key // (base * base), key // base % base, key % base)
+                       for key in combinations.tolist()], dtype=object)
+    discordance = labels[keys]
+
+    # Category (same precedence as count_categories): discordant variants are not ranked by code
+    discordant = conditions[0]
+    has_code = [~discordant & (matrix[:, EVIDENCE_CODES.index(code)] > 0) for code in EVIDENCE_CODES[:6]]
+    category = np.select(has_code + [discordant], CATEGORIES[:7], 'not_classified')
+
+    return {
+        'bs3': bs3_count,
+        'ps3': ps3_count,
+        'hypomorph_calls': hypomorph_count,
+        'outcome': outcome,
+        'ratio': ratio,
+        'discordance': discordance,
+        'category': category,
+        'hypomorph': hypomorph_present,
     }
-    interation = 0
-    for array in arrays:
-        interation += 1
-        array = [item for item in array if not (isinstance(item, float) and math.isnan(item))]
-        is_bs3 = False
-        is_bs3_moderate = False
-        is_bs3_supporting = False
-        is_ps3 = False
-        is_ps3_moderate = False
-        is_ps3_supporting = False
-        is_discordant = False
-        bs3_present = any('BS3' in item for item in array)
-        ps3_present = any('PS3' in item for item in array)
-        hypomorph_present = 'hypomorph' in array
-        
-        if hypomorph_present:
-            categories['hypomorph'] += 1
-
-        if (bs3_present and ps3_present):
-            is_discordant = True
-        else:
-            for item in array:
-                if item == 'BS3':
-                    is_bs3 = True
-                elif item == 'BS3_moderate':
-                    is_bs3_moderate = True
-                elif item == 'BS3_supporting':
-                    is_bs3_supporting = True
-                elif item == 'PS3':
-                    is_ps3 = True
-                elif item == 'PS3_moderate':
-                    is_ps3_moderate = True
-                elif item == 'PS3_supporting':
-                    is_ps3_supporting = True
-        if is_bs3:
-            categories['bs3'] += 1
-        elif is_bs3_moderate:
-            categories['bs3_moderate'] += 1
-        elif is_bs3_supporting:
-            categories['bs3_supporting'] += 1
-        elif is_ps3:
-            categories['ps3'] += 1
-        elif is_ps3_moderate:
-            categories['ps3_moderate'] += 1
-        elif is_ps3_supporting:
-            categories['ps3_supporting'] += 1
-        elif is_discordant:
-            categories['discordant'] += 1
-        else:
-            categories['not_classified'] += 1
-
-            
-    print (interation)
+
+def tally_categories(evidence):
+    tallies = pd.Series(evidence['category']).value_counts()
+    categories = {name: int(tallies.get(name, 0)) for name in CATEGORIES}
+    categories['hypomorph'] = int(evidence['hypomorph'].sum())
     return categories
 
+def count_categories(arrays):
+    print (len(arrays))
+    return tally_categories(classify_evidence(arrays))
+
 def is_valid_ratio(var1, var2, class1, class2):
     # Check if both variables are nonzero
     if var1 == 0 or var2 == 0:
@@ -96,105 +141,126 @@ def is_valid_ratio(var1, var2, class1, class2):
 
 # Define the function to check discordance
 def check_discordance(array):
-    bs3_count = 0
-    ps3_count = 0
-    hypomorph_count = 0
-
-    # Count occurrences of 'BS3', 'PS3', and 'hypomorph'
-    for item in array:
-        if isinstance(item, str):
-            if 'BS3' in item:
-                bs3_count += 1
-            if 'PS3' in item:
-                ps3_count += 1
-            if 'hypomorph' in item:
-                hypomorph_count += 1
-    
-    array = [item for item in array if not (isinstance(item, float) and math.isnan(item))]
-    # Check for the presence of 'BS3', 'PS3', and 'Indeterminate'
-    bs3_present = any('BS3' in item for item in array)
-    ps3_present = any('PS3' in item for item in array)
-    hypomorph_present = 'hypomorph' in array
-
-    # Check for discordance conditions
-    if (bs3_present and ps3_present):
-        ratio_validation = is_valid_ratio(bs3_count, ps3_count, "Benign", "Pathogenic")
-        return f'Discordant:Discordant:{ratio_validation}'
-
-    elif (bs3_present and hypomorph_present):
-        ratio_validation = is_valid_ratio(bs3_count, hypomorph_count, "Benign", "Hypomorph")
-        return f'Hypomorph:Discordant:{ratio_validation}'
-    
-    elif (ps3_present and hypomorph_present):
-        ratio_validation = is_valid_ratio(ps3_count, hypomorph_count, "Pathogenic", "Hypomorph")
-        return f'Hypomorph:Discordant:{ratio_validation}'
-    
-    elif bs3_present:
-        return f'Benign:Concordant:{bs3_count}:-:-'
-    
-    elif ps3_present:
-        return f'Pathogenic:Concordant:{ps3_count}:-:-'
-    
-    elif hypomorph_present:
-        return f'Hypomorph:Concordant:{hypomorph_count}:-:-'
-    
-    else:
-        return 'indeterminate:indeterminate:-:-:-'
+    return classify_evidence([array])['discordance'][0]
+
+def build_class_table(tab_data):
+    # Class lookup indexed by (assay, score): the first column holds the assay, the second
+    # the class for score 2 and the third the class for score 0
+    assays = tab_data.iloc[:, 0].astype(str).to_numpy()
+    table = pd.DataFrame({
+        'assay': np.concatenate([assays, assays]),
+        'score': np.repeat([0, 2], len(assays)),
+        'class': np.concatenate([tab_data.iloc[:, 2].to_numpy(dtype=object), tab_data.iloc[:, 1].to_numpy(dtype=object)]),
+    })
+    # Later rows of the same assay win
+    table = table.drop_duplicates(['assay', 'score'], keep='last')
+    return table.set_index(['assay', 'score'])['class']
 
 def BuildDict(tab_data):
-    # Initialize an empty dictionary to store the final result
+    # Nested {assay: {"0": class, "2": class}} view of the class table
     dict_1 = {}
-    # Iterate through each row in the DataFrame
-    for index, row in tab_data.iterrows():
-        # Extract the values from the first three columns (adjust column names as needed)
-        key_A = str(row.iloc[0])  # Assuming the first column contains the keys
-        value_B = row.iloc[1]      # Assuming the second column contains the values for key '2'
-        value_C = row.iloc[2]      # Assuming the third column contains the values for key '0'
-
-        # Check if the key already exists in dict_1
-        if key_A not in dict_1:
-            # If it doesn't exist, create a new dictionary for the key
-            dict_1[key_A] = {}
-        
-        # Assign values to the inner dictionary
-        dict_1[key_A]["0"] = value_C
-        dict_1[key_A]["2"] = value_B
+    classes = build_class_table(tab_data).to_dict()
+    for assay in pd.unique(tab_data.iloc[:, 0].astype(str)):
+        dict_1[assay] = {"0": classes[(assay, 0)], "2": classes[(assay, 2)]}
     return dict_1
 
+def cell_score(value):
+    # Score of an assay cell read as int(value); None when the cell does not hold an integer score
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def map_evidence(tab_data, class_table):
+    # Long form of the non-null assay cells, column by column (only those cells are copied)
+    row_parts, column_parts, value_parts = [], [], []
+    for position in range(tab_data.shape[1]):
+        column = tab_data.iloc[:, position]
+        present = np.flatnonzero(column.notna().to_numpy())
+        row_parts.append(present)
+        column_parts.append(np.full(len(present), position))
+        value_parts.append(column.to_numpy()[present].astype(object))
+    rows = np.concatenate(row_parts) if row_parts else np.zeros(0, dtype=np.int64)
+    columns = np.concatenate(column_parts) if column_parts else np.zeros(0, dtype=np.int64)
+    values = np.concatenate(value_parts) if value_parts else np.zeros(0, dtype=object)
+    assays = tab_data.columns.to_numpy(dtype=object)[columns]
+
+    # Scores of the distinct cell values (2.0, '2', True, ...)
+    value_codes, unique_values = pd.factorize(pd.Series(values, dtype=object))
+    scores = pd.Series([cell_score(value) for value in unique_values], dtype=object).to_numpy()[value_codes]
+    is_score = pd.notna(scores)
+    hypomorph = is_score & (scores == 1)
+
+    # Join the (assay, score) pairs against the class table; score 1 is always 'hypomorph'
+    positions = np.full(len(rows), -1)
+    lookup = is_score & ~hypomorph
+    positions[lookup] = class_table.index.get_indexer(pd.MultiIndex.from_arrays([assays[lookup], scores[lookup]]))
+    mapped = hypomorph | (positions >= 0)
+    class_values = np.append(class_table.to_numpy(dtype=object), None)  # Position -1 reads None
+    classes = np.where(hypomorph, 'hypomorph', class_values[positions])
+
+    # Cells that could not be mapped, per assay
+    unmapped = pd.DataFrame({
+        'not_a_score': np.bincount(columns[~is_score], minlength=len(tab_data.columns)),
+        'not_in_class_table': np.bincount(columns[is_score & ~mapped], minlength=len(tab_data.columns)),
+    }, index=tab_data.columns)
+    unmapped = unmapped[unmapped.any(axis=1)]
 
-class_braca1_all_spli = BuildDict(df2)
+    # Group the classes by variant, in the order the variants were first reached
+    variants = tab_data.index.to_numpy()[rows[mapped]]
+    grouped = pd.Series(classes[mapped], dtype=object).groupby(variants, sort=False).agg(list)
+    return dict(zip(grouped.index, grouped)), unmapped
 
 
-# You can continue building dictionaries for other columns in a similar manner
-out_put_dict = {}
+def evidence_records(out_put_dict, evidence):
+    # One record per variant; the evidence calls are kept as a list column (NaN calls become None)
+    return pd.DataFrame({
+        'variant': list(out_put_dict.keys()),
+        'discordance': evidence['discordance'],
+        'evidence': [[item if isinstance(item, str) else None for item in value] for value in out_put_dict.values()],
+    })
+
+def write_evidence(path, out_put_dict, evidence, chunk_size=100000):
+    # Writes the classified variants; the format follows the extension:
+    # .txt (key:discordance:list lines), .tsv (evidence as a JSON array), .parquet or .jsonl (evidence as a list)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.txt':
+        items = list(zip(out_put_dict.keys(), evidence['discordance'], out_put_dict.values()))
+        with open(path, 'w', buffering=1 << 20) as file:
+            for start in range(0, len(items), chunk_size):
+                file.write(''.join(f"{key}:{discordance_result}:{value}\n"
+                                   for key, discordance_result, value in items[start:start + chunk_size]))
+        return
+
+    records = evidence_records(out_put_dict, evidence)
+    if extension == '.tsv':
+        records['evidence'] = records['evidence'].map(json.dumps)
+        records.to_csv(path, sep='\t', index=False, quoting=csv.QUOTE_NONE, chunksize=chunk_size)
+    elif extension == '.parquet':
+        records.to_parquet(path, index=False, row_group_size=chunk_size)
+    elif extension == '.jsonl':
+        records.to_json(path, orient='records', lines=True)
+    else:
+        raise ValueError(f"Unsupported output format: {path}")
+
 
-for column in df.columns:
-    column_name = column
-    for index, value in df[column].items():
-        if pd.notna(value):
-            try:
-                value = str(int(value))
-                if value != "1":
-                    class_target = class_braca1_all_spli[column][value]
-                else:
-                    class_target = "hypomorph"
-                # Append class_target to out_put_dict
-                if index not in out_put_dict:
-                    out_put_dict[index] = []
-                out_put_dict[index].append(class_target)
-            except:
-                pass
+if __name__ == "__main__":
+    class_braca1_all_spli = build_class_table(df2)
 
-# Write out_put_dict to a file
-arrays = []
-with open('output_v10_BRCA2.txt', 'w') as file:
-    for key, value in out_put_dict.items():
-        discordance_result = check_discordance(value)
-        arrays.append(value)
-        file.write(f"{key}:{discordance_result}:{value}\n")
-        #file.write(f"Row {key}: {value}\n")
+    # Map every assay cell to its class through the class table
+    out_put_dict, unmapped = map_evidence(df, class_braca1_all_spli)
+    print("Unmapped cells:", int(unmapped.to_numpy().sum()))
+    if len(unmapped):
+        print(unmapped)
 
+    # Classify every variant at once
+    arrays = list(out_put_dict.values())
+    evidence = classify_evidence(arrays)
 
+    # Write out_put_dict to a file (.tsv, .parquet and .jsonl keep the evidence as a list column)
+    for output_path in ['output_v10_BRCA2.txt']:
+        write_evidence(output_path, out_put_dict, evidence)
 
-result = count_categories(arrays)
-print("Total count:", result)
+    print (len(arrays))
+    result = tally_categories(evidence)
+    print("Total count:", result)
@@ -0,0 +1,314 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from BRCA_Integration_numbers import (
+    AssaySummary,
+    IncrementalAssaySummary,
+    SparseAssaySummary,
+    bootstrap_sensitivity_specificity,
+    count_assays_by_sensitivity_specificity,
+    count_assays_by_t6_categories,
+    count_assays_by_variants_tested,
+    count_documented_tested_variants,
+    count_documented_without_t6_and_tested,
+    count_reference_variants_tested,
+    count_tracks_by_tested_variants,
+    number_of_independent_tests,
+    number_of_reference_variants_tests,
+    number_of_vus_variants_tests,
+    sum_assays_tested,
+    sweep_sensitivity_specificity,
+)
+from BRCA_Integration_Classification import (
+    EVIDENCE_CODES,
+    build_class_table,
+    classify_evidence,
+    map_evidence,
+    tally_categories,
+)
+
+# Statistics timed on a prebuilt AssaySummary
+STATISTICS = [
+    sum_assays_tested,
+    count_documented_tested_variants,
+    count_reference_variants_tested,
+    count_documented_without_t6_and_tested,
+    number_of_independent_tests,
+    number_of_reference_variants_tests,
+    number_of_vus_variants_tests,
+    count_assays_by_variants_tested,
+    count_assays_by_t6_categories,
+    count_tracks_by_tested_variants,
+    count_assays_by_sensitivity_specificity,
+    sweep_sensitivity_specificity,
+]
+
+def make_synthetic_calls(n_variants, n_assays, density=0.02, seed=0):
+    """
+    Generates a table with the Sup Table schema without a dense assay block: T1-T5 metadata, T6 reference
+    classes 1-5 (NaN for VUS), T7 documented flag and the sparse T8+ assay calls 0/1/2 as a CSC matrix of
+    call codes (see call_codes in BRCA_Integration_numbers). Assay calls agree with the T6 reference with a
+    per-assay accuracy between 0.5 and 1.
+
+    Parameters:
+        n_variants (int): Number of variants (rows).
+        n_assays (int): Number of assay columns.
+        density (float): Fraction of variants tested by each assay.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: (metadata DataFrame with columns T1-T7, scipy.sparse.csc_array of call codes, assay names).
+    """
+    rng = np.random.default_rng(seed)
+    metadata = {f"T{i}": rng.integers(0, 1000, n_variants) for i in range(1, 6)}
+    metadata["T6"] = np.where(rng.random(n_variants) < 0.4, rng.integers(1, 6, n_variants), np.nan)
+    metadata["T7"] = (rng.random(n_variants) < 0.5).astype(float)
+
+    # Expected call of each reference variant: 0 for benign (T6 1-2), 2 for pathogenic (T6 4-5)
+    expected = np.select([np.isin(metadata["T6"], [1, 2]), np.isin(metadata["T6"], [4, 5])], [0.0, 2.0], np.nan)
+
+    # CSC arrays filled one assay at a time: tested_per_assay sorted rows per column
+    accuracy = rng.uniform(0.5, 1.0, n_assays)
+    tested_per_assay = max(1, int(n_variants * density))
+    indices = np.empty(n_assays * tested_per_assay, dtype=np.int32)
+    data = np.empty(n_assays * tested_per_assay, dtype=np.int8)
+    for assay in range(n_assays):
+        rows = np.sort(rng.choice(n_variants, tested_per_assay, replace=False))
+        column = rng.choice([0.0, 1.0, 2.0], tested_per_assay)
+        agrees = (rng.random(tested_per_assay) < accuracy[assay]) & ~np.isnan(expected[rows])
+        cells = slice(assay * tested_per_assay, (assay + 1) * tested_per_assay)
+        indices[cells] = rows
+        data[cells] = np.where(agrees, expected[rows], column) + 1
+    indptr = np.arange(n_assays + 1, dtype=np.int64) * tested_per_assay
+
+    calls = sparse.csc_array((data, indices, indptr), shape=(n_variants, n_assays))
+    return pd.DataFrame(metadata), calls, np.array([f"T{8 + i}" for i in range(n_assays)], dtype=object)
+
+def make_synthetic_table(n_variants, n_assays, density=0.02, seed=0, dense=True):
+    """
+    Generates the make_synthetic_calls table as a DataFrame (see calls_to_table).
+
+    Parameters:
+        n_variants (int): Number of variants (rows).
+        n_assays (int): Number of assay columns.
+        density (float): Fraction of variants tested by each assay.
+        seed (int): Seed of the random generator.
+        dense (bool): Float assay columns; otherwise pandas sparse columns.
+
+    Returns:
+        pd.DataFrame: The synthetic table.
+    """
+    return calls_to_table(*make_synthetic_calls(n_variants, n_assays, density, seed), dense=dense)
+
+def calls_to_table(metadata, calls, assays, dense=True):
+    """
+    Turns make_synthetic_calls output into a DataFrame: T1-T7 metadata and T8+ assay columns with
+    0/1/2 calls (NaN where the assay did not test the variant).
+
+    Parameters:
+        metadata (pd.DataFrame): T1-T7 columns.
+        calls (scipy.sparse.csc_array): Call codes (variants x assays).
+        assays (np.ndarray): Assay names.
+        dense (bool): Float assay columns; otherwise pandas sparse columns (NaN fill), built one column at a time.
+
+    Returns:
+        pd.DataFrame: The synthetic table.
+    """
+    n_variants, n_assays = calls.shape
+
+    def assay_column(position):
+        column = np.full(n_variants, np.nan)
+        cells = slice(calls.indptr[position], calls.indptr[position + 1])
+        column[calls.indices[cells]] = calls.data[cells] - 1.0
+        return column
+
+    if dense:
+        assay_table = pd.DataFrame(np.column_stack([assay_column(position) for position in range(n_assays)])
+                                   if n_assays else np.zeros((n_variants, 0)), columns=assays)
+    else:
+        # One dense column at a time
+        assay_table = pd.DataFrame({
+            assay: pd.arrays.SparseArray(assay_column(position), fill_value=np.nan)
+            for position, assay in enumerate(assays)
+        }, index=metadata.index)
+    return pd.concat([metadata, assay_table], axis=1)
+
+def make_class_table(assay_columns, seed=0):
+    """
+    Generates a class table for the classification pipeline: assay name, class for score 2 and class for score 0.
+
+    Parameters:
+        assay_columns (list): Assay column names.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: The synthetic class table.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "assay": list(assay_columns),
+        "class_2": rng.choice([code for code in EVIDENCE_CODES if code.startswith("PS3")], len(assay_columns)),
+        "class_0": rng.choice([code for code in EVIDENCE_CODES if code.startswith("BS3")], len(assay_columns)),
+    })
+
+def measure(function, repeat):
+    """
+    Times a call (best of `repeat` runs) and measures its peak traced memory in a separate run.
+
+    Parameters:
+        function (callable): The call to measure, without arguments.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        dict: 'seconds' (best wall time) and 'peak_mb' (peak memory allocated during the call).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_mb": peak / 2**20}
+
+def benchmark_size(n_variants, n_assays, density, repeat, seed=0, dense=True):
+    """
+    Measures every BRCA_Integration_numbers statistic and the classification pipeline on one synthetic table.
+    With dense=False (sizes too large for a dense assay block) only the sparse and incremental paths run:
+    the statistics are timed on a SparseAssaySummary of the CSC calls, and the incremental summary reads
+    pandas sparse columns.
+
+    Returns:
+        dict: Benchmark names mapped to their measure() results.
+    """
+    metadata, calls, assays = make_synthetic_calls(n_variants, n_assays, density, seed)
+    df = calls_to_table(metadata, calls, assays, dense=dense)
+    results = {}
+
+    # Statistics from the DataFrame and from a prebuilt summary
+    results["SparseAssaySummary (CSC calls)"] = measure(lambda: SparseAssaySummary(metadata, calls, assays), repeat)
+    if dense:
+        results["AssaySummary"] = measure(lambda: AssaySummary(df), repeat)
+        summary = AssaySummary(df)
+    else:
+        summary = SparseAssaySummary(metadata, calls, assays)
+    for statistic in STATISTICS:
+        results[statistic.__name__] = measure(lambda: statistic(summary), repeat)
+    if dense:
+        results["count_assays_by_sensitivity_specificity (DataFrame)"] = \
+            measure(lambda: count_assays_by_sensitivity_specificity(df), repeat)
+        results["SparseAssaySummary"] = measure(lambda: SparseAssaySummary(df), repeat)
+        results["bootstrap_sensitivity_specificity (1000 replicates)"] = \
+            measure(lambda: bootstrap_sensitivity_specificity(df, replicates=1000), repeat)
+
+    # Incremental summary with a cold and a warm cache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "incremental.pkl")
+
+        def cold_run():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            IncrementalAssaySummary(df, cache_path)
+
+        results["IncrementalAssaySummary (cold)"] = measure(cold_run, repeat)
+        results["IncrementalAssaySummary (warm)"] = measure(lambda: IncrementalAssaySummary(df, cache_path), repeat)
+
+    if not dense:
+        return results
+
+    # Classification pipeline on the assay block
+    assay_table = df.iloc[:, 7:]
+    class_data = make_class_table(assay_table.columns, seed)
+    results["build_class_table"] = measure(lambda: build_class_table(class_data), repeat)
+    class_table = build_class_table(class_data)
+    results["map_evidence"] = measure(lambda: map_evidence(assay_table, class_table), repeat)
+    arrays = list(map_evidence(assay_table, class_table)[0].values())
+    results["classify_evidence"] = measure(lambda: classify_evidence(arrays), repeat)
+    evidence = classify_evidence(arrays)
+    results["tally_categories"] = measure(lambda: tally_categories(evidence), repeat)
+
+    return results
+
+def find_regressions(results, baseline, tolerance, min_seconds):
+    """
+    Compares results with a baseline and lists the measurements that got worse by more than `tolerance`
+    (time differences under `min_seconds` are ignored as noise).
+
+    Returns:
+        list: Human-readable regression messages.
+    """
+    regressions = []
+    for size, measurements in results.items():
+        for name, measurement in measurements.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            if measurement["seconds"] > reference["seconds"] * (1 + tolerance) and \
+                    measurement["seconds"] - reference["seconds"] > min_seconds:
+                regressions.append(f"{size} {name}: {reference['seconds']:.4f}s -> {measurement['seconds']:.4f}s")
+            if measurement["peak_mb"] > reference["peak_mb"] * (1 + tolerance) and \
+                    measurement["peak_mb"] - reference["peak_mb"] > 1:
+                regressions.append(f"{size} {name}: {reference['peak_mb']:.1f}MB -> {measurement['peak_mb']:.1f}MB")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the BRCA scripts on synthetic Sup Table-shaped data.")
+    parser.add_argument("--variants", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--assays", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--density", type=float, default=0.02, help="fraction of variants tested by each assay")
+    parser.add_argument("--max-cells", type=float, default=5e7,
+                        help="only run the sparse and incremental paths for sizes whose dense variants x assays "
+                             "block exceeds this many cells")
+    parser.add_argument("--max-tested", type=float, default=1e8,
+                        help="skip sizes with more tested cells than this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for n_variants in args.variants:
+        for n_assays in args.assays:
+            size = f"{n_variants}x{n_assays}"
+            if n_assays * max(1, int(n_variants * args.density)) > args.max_tested:
+                print(f"{size}: skipped (more than {args.max_tested:.0f} tested cells)")
+                continue
+            dense = n_variants * n_assays <= args.max_cells
+            results[size] = benchmark_size(n_variants, n_assays, args.density, args.repeat, dense=dense)
+            for name, measurement in results[size].items():
+                print(f"{size:>14}  {name:<52} {measurement['seconds']:10.4f}s {measurement['peak_mb']:10.1f}MB")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as handle:
+            json.dump(results, handle, indent=2)
+    elif args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = find_regressions(results, baseline, args.tolerance, args.min_seconds)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
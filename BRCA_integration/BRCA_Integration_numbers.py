@@ -1,75 +1,932 @@
+import hashlib
+import os
+import pickle
+import numpy as np
+import openpyxl
 import pandas as pd
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from openpyxl.cell.cell import ERROR_CODES
 
-def count_assays_by_sensitivity_specificity(df):
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Without pyarrow the sheets are always parsed from the workbook
+    pa = feather = None
+
+try:
+    from scipy import sparse
+except ImportError:  # The sparse backend is unavailable without scipy
+    sparse = None
+
+# Directory holding the Arrow copies of the workbook sheets
+CACHE_DIR = ".brca_cache"
+
+# Stream the sheets with openpyxl (read-only) instead of loading them into DataFrames
+STREAMING = False
+
+# Only recompute the assay columns that changed since the last run
+INCREMENTAL = False
+
+# Hold the assay calls in a sparse matrix (memory scales with the tested cells)
+SPARSE = False
+
+# Strings pd.read_excel reads as NaN by default
+NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+def count_assay_block(calls, tested, benign, pathogenic):
+    """
+    Counts, for every assay column, the tested variants and the benign/pathogenic confusion counts of a block of rows.
+    T6 values 1-2 are benign references (expected call 0) and 4-5 are pathogenic references (expected call 2).
+
+    Parameters:
+        calls (np.ndarray): Assay results (variants x assays).
+        tested (np.ndarray): Boolean matrix, True where the assay result is not NaN.
+        benign (np.ndarray): Boolean row mask of the benign reference variants.
+        pathogenic (np.ndarray): Boolean row mask of the pathogenic reference variants.
+
+    Returns:
+        dict: One NumPy array per statistic, aligned with the assay columns: 'tested', 'total_benign', 'tp_benign',
+              'fp_benign', 'total_pathogenic', 'tp_pathogenic' and 'fp_pathogenic'.
+    """
+    called_benign = tested & (calls == 0)
+    called_pathogenic = tested & (calls == 2)
+    return {
+        "tested": tested.sum(axis=0),
+        "total_benign": tested[benign].sum(axis=0),
+        "tp_benign": called_benign[benign].sum(axis=0),  # Called benign (0)
+        "fp_benign": called_pathogenic[benign].sum(axis=0),  # Called pathogenic (2)
+        "total_pathogenic": tested[pathogenic].sum(axis=0),
+        "tp_pathogenic": called_pathogenic[pathogenic].sum(axis=0),  # Called pathogenic (2)
+        "fp_pathogenic": called_benign[pathogenic].sum(axis=0),  # Called benign (0)
+    }
+
+class AssayAggregates:
+    """
+    Per-assay and per-variant aggregates of one Sup Table sheet, which every statistic in this script is
+    derived from: the assay names and test counts, the confusion counts with the per-assay sensitivity and
+    specificity, the totals of tested variants per category and the distributions of tests per variant.
+    get_assay_summary accepts any AssayAggregates in place of a DataFrame.
+    """
+    def set_variant_counts(self, n_variants, total_tests, documented_tested, reference_tested, documented_vus_tested,
+                           variant_test_distribution, reference_test_distribution, vus_test_distribution):
+        """
+        Stores the per-variant aggregates: totals of tested variants per category and the distributions of
+        the number of tests per variant (all, reference and VUS variants).
+        """
+        self.n_variants = n_variants
+        self.total_tests = total_tests
+        self.documented_tested = documented_tested
+        self.reference_tested = reference_tested
+        self.documented_vus_tested = documented_vus_tested
+        self.variant_test_distribution = variant_test_distribution
+        self.reference_test_distribution = reference_test_distribution
+        self.vus_test_distribution = vus_test_distribution
+
+    def set_assay_counts(self, assays, block):
+        """
+        Stores the per-assay aggregates from count_assay_block and derives the confusion counts,
+        including the per-assay sensitivity and specificity.
+        """
+        self.assays = assays
+        self.n_assays = len(assays)
+        self.assay_test_counts = block["tested"]
+        self.benign_test_counts = block["total_benign"]
+        self.pathogenic_test_counts = block["total_pathogenic"]
+        self.confusion = {"assays": assays}
+        self.confusion.update((key, value) for key, value in block.items() if key != "tested")
+        self.confusion["sensitivity"], self.confusion["specificity"] = assay_sensitivity_specificity(self.confusion)
+
+class AssaySummary(AssayAggregates):
+    """
+    Precomputed view of one Sup Table sheet, built in a single pass over the data.
+    Holds the bit-packed presence matrix of the assay columns (T8 onward), the T6/T7 row masks and
+    the per-assay / per-variant aggregates that every statistic in this script is derived from.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame. T6 is the reference column, T7 the documented flag,
+                           and T8 onward are assay columns.
+    """
+    def __init__(self, df):
+        # Standardize column names for the T6/T7 lookups
+        columns = df.columns.str.strip()
+        self.set_row_masks(df, columns)
+
+        # Select assay columns (from T8 onward)
+        assays = np.asarray(columns[7:])  # Skip the first 7 metadata columns (T1 to T7)
+        calls = df.iloc[:, 7:].to_numpy()
+        tested = pd.notna(calls)
+
+        # Presence matrix (variants x assays), packed 8 variants per byte
+        self.presence_bits = np.packbits(tested, axis=0)
+
+        self.set_variant_test_counts(tested.sum(axis=1))
+        self.set_assay_counts(assays, count_assay_block(calls, tested, self.benign, self.pathogenic))
+
+    def set_row_masks(self, df, columns):
+        """
+        Stores the row masks from the reference (T6) and documented (T7) columns.
+        """
+        t6 = pd.Series(df.iloc[:, columns.get_loc("T6")].to_numpy())
+        t7 = pd.Series(df.iloc[:, columns.get_loc("T7")].to_numpy())
+        self.benign = t6.isin([1, 2]).to_numpy()  # T6 = 1 or 2 for benign
+        self.pathogenic = t6.isin([4, 5]).to_numpy()  # T6 = 4 or 5 for pathogenic
+        self.vus = t6.isna().to_numpy()  # No T6 value
+        self.reference = ~self.vus
+        self.documented = (t7 == 1).to_numpy()  # T7 = 1 for documented
+
+    def set_variant_test_counts(self, variant_test_counts):
+        """
+        Stores the number of tests per variant and derives the per-variant aggregates from the row masks.
+        """
+        self.variant_test_counts = variant_test_counts
+        self.tested_variants = self.variant_test_counts > 0
+
+        self.set_variant_counts(
+            n_variants=len(self.variant_test_counts),
+            total_tests=self.variant_test_counts.sum(),
+            documented_tested=(self.documented & self.tested_variants).sum(),
+            reference_tested=(self.reference & self.tested_variants).sum(),
+            documented_vus_tested=(self.documented & self.vus & self.tested_variants).sum(),
+            variant_test_distribution=dict(ordered_distribution(self.variant_test_counts)),
+            reference_test_distribution=dict(ordered_distribution(self.variant_test_counts[self.reference])),
+            vus_test_distribution=dict(ordered_distribution(self.variant_test_counts[self.vus])),
+        )
+
+    def presence(self):
+        """
+        Unpacks the presence matrix.
+
+        Returns:
+            np.ndarray: Boolean matrix (variants x assays), True where the assay tested the variant.
+        """
+        return np.unpackbits(self.presence_bits, axis=0, count=self.n_variants).astype(bool)
+
+def column_fingerprint(column):
+    """
+    Fingerprints the contents of a column (values and order, not the name).
+
+    Parameters:
+        column (pd.Series): The column to fingerprint.
+
+    Returns:
+        str: The hexadecimal SHA-1 of the column's row hashes.
+    """
+    return hashlib.sha1(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes()).hexdigest()
+
+class IncrementalAssaySummary(AssaySummary):
+    """
+    AssaySummary that persists its per-assay aggregates between runs and only processes assay columns
+    whose contents changed. Each assay column is cached under its name (and its occurrence among columns
+    of the same name) with a fingerprint of its values, its count_assay_block counts and its packed
+    presence bits; the per-variant test counts are updated by removing the bits of changed or dropped
+    columns and adding those of new ones. Changes to the T6/T7 columns or to the rows invalidate the
+    whole cache. The statistics match AssaySummary(df).
+    Changed columns are counted in blocks, so the assay columns may also be pandas sparse columns.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame. T6 is the reference column, T7 the documented flag,
+                           and T8 onward are assay columns.
+        cache_path (str): Path of the pickle holding the cached aggregates.
+        block_cells (int): Largest number of cells of a dense block of changed columns.
+    """
+    def __init__(self, df, cache_path, block_cells=1 << 24):
+        # Standardize column names for the T6/T7 lookups
+        columns = df.columns.str.strip()
+        self.set_row_masks(df, columns)
+        assays = np.asarray(columns[7:])  # Skip the first 7 metadata columns (T1 to T7)
+
+        # The cached counts are only valid for the same rows and reference/documented values
+        rows_fingerprint = column_fingerprint(pd.concat([
+            df.iloc[:, columns.get_loc("T6")], df.iloc[:, columns.get_loc("T7")]
+        ], ignore_index=True))
+        cache = {"rows": None, "columns": {}, "variant_test_counts": None}
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as handle:
+                cache = pickle.load(handle)
+        if cache["rows"] != rows_fingerprint:
+            cache = {"rows": rows_fingerprint, "columns": {}, "variant_test_counts": np.zeros(len(df), dtype=np.int64)}
+
+        # Columns are cached by (name, occurrence), as names like "A" and "A " strip to the same assay name
+        occurrences = {}
+        keys = []
+        for assay in assays:
+            keys.append((assay, occurrences.get(assay, 0)))
+            occurrences[assay] = keys[-1][1] + 1
+
+        # Find the assay columns whose contents changed since the cached run
+        fingerprints = [column_fingerprint(df.iloc[:, position]) for position in range(7, df.shape[1])]
+        changed = [index for index, (key, fingerprint) in enumerate(zip(keys, fingerprints))
+                   if cache["columns"].get(key, {}).get("fingerprint") != fingerprint]
+        self.changed_assays = assays[changed]
+
+        # Remove the cached contributions of changed and dropped columns
+        variant_test_counts = cache["variant_test_counts"]
+        current = dict(zip(keys, fingerprints))
+        for key, entry in list(cache["columns"].items()):
+            if current.get(key) != entry["fingerprint"]:
+                variant_test_counts = variant_test_counts - np.unpackbits(entry["bits"], count=len(df))
+                del cache["columns"][key]
+
+        # Count only the changed columns, a block at a time, and add their contributions
+        block_size = max(1, block_cells // max(len(df), 1))
+        for start in range(0, len(changed), block_size):
+            block_changed = changed[start:start + block_size]
+            calls = df.iloc[:, [7 + index for index in block_changed]].to_numpy()
+            tested = pd.notna(calls)
+            block = count_assay_block(calls, tested, self.benign, self.pathogenic)
+            variant_test_counts = variant_test_counts + tested.sum(axis=1)
+            bits = np.packbits(tested, axis=0)
+            for position, index in enumerate(block_changed):
+                cache["columns"][keys[index]] = {
+                    "fingerprint": fingerprints[index],
+                    "counts": {key: value[position] for key, value in block.items()},
+                    "bits": bits[:, position],
+                }
+        cache["variant_test_counts"] = variant_test_counts
+
+        # Persist the aggregates for the next run
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path + ".tmp", "wb") as handle:
+            pickle.dump(cache, handle)
+        os.replace(cache_path + ".tmp", cache_path)
+
+        entries = [cache["columns"][key] for key in keys]
+        self.presence_bits = np.stack([entry["bits"] for entry in entries], axis=1) if entries else \
+            np.packbits(np.zeros((len(df), 0), dtype=bool), axis=0)
+        self.set_variant_test_counts(variant_test_counts.astype(np.int64))
+        self.set_assay_counts(assays, {
+            key: np.array([entry["counts"][key] for entry in entries], dtype=np.int64)
+            for key in ["tested", "total_benign", "tp_benign", "fp_benign", "total_pathogenic", "tp_pathogenic", "fp_pathogenic"]
+        })
+
+def call_codes(values):
+    """
+    Encodes tested assay results as int8 codes: call + 1 for calls 0, 1 and 2, and 4 for any other value,
+    so that untested cells can be the implicit zeros of a sparse matrix.
+    """
+    codes = np.full(len(values), 4, dtype=np.int8)
+    for call in (0, 1, 2):
+        codes[values == call] = call + 1
+    return codes
+
+def sparse_calls(df):
+    """
+    Builds a sparse (CSC) matrix of the assay calls (T8 onward), one column at a time, without a dense copy.
+    Only tested cells are stored, as call_codes.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame.
+
+    Returns:
+        scipy.sparse.csc_array: The (variants x assays) call codes.
+    """
+    return sparse_calls_from_columns((df.iloc[:, position] for position in range(7, df.shape[1])), len(df))
+
+def sparse_calls_from_columns(columns, n_variants):
+    """
+    Builds the CSC call codes from assay columns, holding one dense column at a time.
+
+    Parameters:
+        columns (iterable): Assay columns (pd.Series or 1-D arrays, NaN where not tested).
+        n_variants (int): Number of variants (rows).
+
+    Returns:
+        scipy.sparse.csc_array: The (variants x assays) call codes.
+    """
+    indptr = [0]
+    indices = []
+    data = []
+    for column in columns:
+        column = np.asarray(column)
+        rows = np.flatnonzero(pd.notna(column))
+        indices.append(rows)
+        data.append(call_codes(column[rows]))
+        indptr.append(indptr[-1] + len(rows))
+
+    return sparse.csc_array(
+        (np.concatenate(data or [np.zeros(0, dtype=np.int8)]),
+         np.concatenate(indices or [np.zeros(0, dtype=np.int64)]),
+         np.asarray(indptr)),
+        shape=(n_variants, len(indptr) - 1),
+    )
+
+class SparseAssaySummary(AssaySummary):
+    """
+    AssaySummary computed from a sparse (CSC) matrix of the assay calls. Per-assay test counts come straight
+    from the CSC index pointers, per-variant test counts from the row indices, and the confusion counts from
+    the stored call codes (see call_codes). Built from the calls of load_sparse_sheet, no dense copy of the
+    assay block is ever made, so memory scales with the number of tested cells.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame, or only its metadata columns (T1 to T7) when calls is given.
+        calls (scipy.sparse matrix, optional): Call codes as built by sparse_calls (variants x assays).
+        assays (array-like, optional): Assay names of the calls columns.
+    """
+    def __init__(self, df, calls=None, assays=None):
+        if sparse is None:
+            raise ImportError("SparseAssaySummary requires scipy")
+
+        # Standardize column names for the T6/T7 lookups
+        columns = df.columns.str.strip()
+        self.set_row_masks(df, columns)
+
+        if calls is None:
+            calls = sparse_calls(df)
+            assays = columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
+        self.calls = sparse.csc_array(calls)
+        self.presence_bits = None
+
+        # Column of every stored (tested) cell
+        n_variants, n_assays = self.calls.shape
+        tested_per_assay = np.diff(self.calls.indptr)
+        cells_assay = np.repeat(np.arange(n_assays), tested_per_assay)
+        cells_variant = self.calls.indices
+        codes = self.calls.data
+        benign = self.benign[cells_variant]
+        pathogenic = self.pathogenic[cells_variant]
+
+        def per_assay(mask):
+            return np.bincount(cells_assay[mask], minlength=n_assays)
+
+        self.set_variant_test_counts(np.bincount(cells_variant, minlength=n_variants))
+        self.set_assay_counts(np.asarray(assays), {
+            "tested": tested_per_assay,
+            "total_benign": per_assay(benign),
+            "tp_benign": per_assay(benign & (codes == 1)),  # Called benign (0)
+            "fp_benign": per_assay(benign & (codes == 3)),  # Called pathogenic (2)
+            "total_pathogenic": per_assay(pathogenic),
+            "tp_pathogenic": per_assay(pathogenic & (codes == 3)),  # Called pathogenic (2)
+            "fp_pathogenic": per_assay(pathogenic & (codes == 1)),  # Called benign (0)
+        })
+
+    def presence(self):
+        """
+        Expands the sparse calls into the dense presence matrix.
+
+        Returns:
+            np.ndarray: Boolean matrix (variants x assays), True where the assay tested the variant.
+        """
+        return self.calls.toarray() != 0
+
+def is_blank(value):
+    """
+    Tells whether a cell value read with openpyxl is an empty cell.
+    """
+    return value is None or value == ""
+
+def is_missing(value):
+    """
+    Tells whether a cell value read with openpyxl would be NaN in pd.read_excel
+    (empty cells, Excel error values and pandas' default NA strings).
+    """
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value in NA_STRINGS or value in ERROR_CODES
+    return isinstance(value, float) and np.isnan(value)
+
+def read_chunk(chunk, width, conversions, texts, others):
+    """
+    Turns a chunk of streamed rows into an object array, as pd.read_excel would parse its cells.
+    pd.read_excel reads a column whose values are all numbers or numbers stored as text as numbers,
+    which depends on the whole column: the distinct strings of each column are recorded in texts, and
+    the columns holding other non-numeric values (dates, ...) in others, for numeric_conversions.
+    Strings found in conversions are replaced by their numbers.
+
+    Parameters:
+        chunk (list): Rows padded to width, as yielded by stream_sheet.
+        width (int): Number of columns.
+        conversions (dict): Column positions mapped to {string: number} from numeric_conversions.
+        texts (dict): Column positions mapped to the set of their distinct non-NA strings (updated).
+        others (set): Positions of the columns holding non-numeric values that are not strings (updated).
+
+    Returns:
+        tuple: The (rows x columns) object array of values and its boolean missing mask.
+    """
+    values = np.empty((len(chunk), width), dtype=object)
+    values[:] = chunk
+    missing = np.frompyfunc(is_missing, 1, 1)(values).astype(bool)
+
+    strings = np.frompyfunc(lambda value: isinstance(value, str), 1, 1)(values).astype(bool) & ~missing
+    for position in np.flatnonzero(strings.any(axis=0)):
+        texts.setdefault(int(position), set()).update(values[strings[:, position], position])
+    numbers = np.frompyfunc(lambda value: isinstance(value, (int, float)), 1, 1)(values).astype(bool)
+    others.update(np.flatnonzero((~(missing | strings | numbers)).any(axis=0)).tolist())
+
+    for position, numbers_by_text in conversions.items():
+        rows = np.flatnonzero(strings[:, position])
+        values[rows, position] = [numbers_by_text[value] for value in values[rows, position]]
+    return values, missing
+
+def numeric_conversions(texts, others):
+    """
+    Finds the columns that pd.read_excel parses as numbers although some of their cells hold text:
+    those whose values are all numbers, NA or strings that parse as numbers.
+
+    Parameters:
+        texts (dict): Column positions mapped to their distinct non-NA strings, from read_chunk.
+        others (set): Positions of the columns holding other non-numeric values, from read_chunk.
+
+    Returns:
+        dict: Column positions mapped to {string: number} for those columns.
+    """
+    conversions = {}
+    for position, strings in texts.items():
+        if position in others:
+            continue
+        strings = sorted(strings)
+        try:
+            numbers = pd.to_numeric(pd.Series(strings, dtype=object))
+        except (ValueError, TypeError):
+            continue
+        conversions[position] = dict(zip(strings, numbers.astype(float).tolist()))
+    return conversions
+
+def stream_sheet(file_path, sheet_name, chunk_size=1000):
+    """
+    Streams a Sup Table sheet with openpyxl in read-only mode, as read_sheet would read it: the second row
+    gives the column names (named like pd.read_excel does), trailing blank rows are dropped and blank rows
+    between data rows are kept as empty rows.
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+        chunk_size (int): Number of rows per chunk.
+
+    Yields:
+        list: The column names first, then chunks of up to chunk_size rows, each a list padded with None
+              to the number of columns.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name]
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+        next(rows, None)  # Skip the first row (metadata)
+
+        # Second row as column headers, named like pd.read_excel does
+        header = list(next(rows, ()))
+        while header and is_blank(header[-1]):
+            header.pop()
+        columns = []
+        for position, name in enumerate(header):
+            name = f"Unnamed: {position}" if is_blank(name) else name
+            duplicates = 0
+            while (f"{name}.{duplicates}" if duplicates else name) in columns:
+                duplicates += 1
+            columns.append(f"{name}.{duplicates}" if duplicates else name)
+        yield columns
+        width = len(columns)
+
+        chunk = []
+        blank_rows = 0
+        for row in rows:
+            row = list(row)
+            while row and is_blank(row[-1]):
+                row.pop()
+            if not row:
+                # Blank rows only count once a later row has data (pandas trims trailing blank rows)
+                blank_rows += 1
+                continue
+            if len(row) > width:
+                raise ValueError(f"{sheet_name}: row wider than the header; use read_sheet instead")
+            chunk.extend([None] * width for _ in range(blank_rows))
+            blank_rows = 0
+            chunk.append(row + [None] * (width - len(row)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+class StreamingAssaySummary(AssayAggregates):
+    """
+    AssayAggregates built by streaming a sheet with openpyxl in read-only mode (see stream_sheet).
+    Rows are read in chunks and folded into the per-assay and per-variant counters, so peak memory is
+    bounded by the number of columns (times chunk_size), not by the number of variants. The statistics
+    match AssaySummary(read_sheet(file_path, sheet_name)); unlike an AssaySummary, no per-variant row
+    masks or presence matrix are kept. A sheet with numbers stored as text in columns that pd.read_excel
+    parses as numbers (see numeric_conversions) is streamed a second time, converting them.
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+        chunk_size (int): Number of rows processed at a time.
+    """
+    def __init__(self, file_path, sheet_name, chunk_size=1000):
+        self.conversions = {}
+        stripped = self.read(file_path, sheet_name, chunk_size)
+        conversions = numeric_conversions(self.texts, self.others)
+        if conversions:
+            self.conversions = conversions
+            self.read(file_path, sheet_name, chunk_size)
+
+        if self.block is None:
+            self.block = {key: np.zeros(self.width - 7, dtype=np.int64) for key in
+                          ["tested", "total_benign", "tp_benign", "fp_benign", "total_pathogenic", "tp_pathogenic", "fp_pathogenic"]}
+
+        self.set_variant_counts(
+            n_variants=self.n_variants,
+            total_tests=np.int64(self.totals["tests"]),
+            documented_tested=np.int64(self.totals["documented_tested"]),
+            reference_tested=np.int64(self.totals["reference_tested"]),
+            documented_vus_tested=np.int64(self.totals["documented_vus_tested"]),
+            variant_test_distribution=dict(sorted(self.variant_tests.items())),
+            reference_test_distribution=dict(sorted(self.reference_tests.items())),
+            vus_test_distribution=dict(sorted(self.vus_tests.items())),
+        )
+        self.set_assay_counts(np.asarray(stripped[7:], dtype=object), self.block)
+
+    def read(self, file_path, sheet_name, chunk_size):
+        """
+        Streams the sheet into fresh counters, converting the strings in self.conversions.
+
+        Returns:
+            list: The stripped column names.
+        """
+        chunks = stream_sheet(file_path, sheet_name, chunk_size)
+        columns = next(chunks)
+        stripped = [name.strip() if isinstance(name, str) else name for name in columns]
+        self.t6_index = stripped.index("T6")
+        self.t7_index = stripped.index("T7")
+        self.width = len(columns)
+
+        self.n_variants = 0
+        self.variant_tests = {}
+        self.reference_tests = {}
+        self.vus_tests = {}
+        self.totals = dict.fromkeys(["tests", "documented_tested", "reference_tested", "documented_vus_tested"], 0)
+        self.block = None
+        self.texts = {}
+        self.others = set()
+        for chunk in chunks:
+            self.add_chunk(chunk)
+        return stripped
+
+    def add_chunk(self, chunk):
+        """
+        Folds a chunk of rows into the per-assay and per-variant counters.
+        """
+        values, missing = read_chunk(chunk, self.width, self.conversions, self.texts, self.others)
+
+        # Row masks from the reference (T6) and documented (T7) columns
+        t6 = values[:, self.t6_index]
+        benign = np.array([value in (1, 2) for value in t6], dtype=bool)
+        pathogenic = np.array([value in (4, 5) for value in t6], dtype=bool)
+        vus = missing[:, self.t6_index]
+        documented = np.array([value == 1 for value in values[:, self.t7_index]], dtype=bool)
+
+        # Assay block counts
+        tested = ~missing[:, 7:]
+        calls = values[:, 7:]
+        block = count_assay_block(calls, tested, benign, pathogenic)
+        if self.block is None:
+            self.block = block
+        else:
+            for key, value in block.items():
+                self.block[key] = self.block[key] + value
+
+        # Per-variant counts
+        variant_test_counts = tested.sum(axis=1)
+        tested_variants = variant_test_counts > 0
+        self.n_variants += len(chunk)
+        self.totals["tests"] += int(variant_test_counts.sum())
+        self.totals["documented_tested"] += int((documented & tested_variants).sum())
+        self.totals["reference_tested"] += int((~vus & tested_variants).sum())
+        self.totals["documented_vus_tested"] += int((documented & vus & tested_variants).sum())
+        for distribution, mask in [(self.variant_tests, slice(None)), (self.reference_tests, ~vus), (self.vus_tests, vus)]:
+            tests, counts = np.unique(variant_test_counts[mask], return_counts=True)
+            for test, count in zip(tests.tolist(), counts.tolist()):
+                distribution[test] = distribution.get(test, 0) + count
+
+def summarize_sheet(file_path, sheet_name, streaming=False, incremental=False, sparse=False, cache_dir=CACHE_DIR):
+    """
+    Builds the AssaySummary of a Sup Table sheet (the AssayAggregates only, when streaming).
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+        streaming (bool): Stream the sheet with openpyxl instead of loading it into a DataFrame.
+        incremental (bool): Reuse the cached aggregates of unchanged assay columns (ignored when streaming).
+        sparse (bool): Load the assay calls straight into a sparse matrix, without a dense copy
+                       (ignored when streaming or incremental).
+        cache_dir (str): Directory for the cached sheets and aggregates.
+
+    Returns:
+        AssayAggregates: The summary of the sheet.
+    """
+    if streaming:
+        return StreamingAssaySummary(file_path, sheet_name)
+    if sparse and not incremental:
+        return SparseAssaySummary(*load_sparse_sheet(file_path, sheet_name, cache_dir=cache_dir))
+    df = load_sheet(file_path, sheet_name, cache_dir=cache_dir)
+    if incremental:
+        workbook = os.path.splitext(os.path.basename(file_path))[0]
+        cache_path = os.path.join(cache_dir, f"incremental.{workbook}.{sheet_name.replace(' ', '_')}.pkl")
+        return IncrementalAssaySummary(df, cache_path)
+    return AssaySummary(df)
+
+def get_assay_summary(df):
+    """
+    Returns the AssaySummary for a sheet, building it only if a DataFrame is given.
+
+    Parameters:
+        df (pd.DataFrame or AssayAggregates): The input DataFrame or an already built summary.
+
+    Returns:
+        AssayAggregates: The summary of the sheet.
+    """
+    if isinstance(df, AssayAggregates):
+        return df
+    return AssaySummary(df)
+
+def ordered_distribution(test_counts):
+    """
+    Counts the frequency of each unique number of tests, ordered by the number of tests.
+
+    Parameters:
+        test_counts (np.ndarray): Number of tests per assay or per variant.
+
+    Returns:
+        dict: An ordered dictionary where keys are the number of tests and values are the counts.
+    """
+    distribution = pd.Series(test_counts).value_counts().to_dict()
+    return OrderedDict(sorted(distribution.items()))
+
+def build_assay_confusion_counts(df):
+    """
+    Builds the benign/pathogenic confusion counts for all assay columns at once.
+    T6 values 1-2 are benign references (expected call 0) and 4-5 are pathogenic references (expected call 2).
+
+    Parameters:
+        df (pd.DataFrame or AssaySummary): The input DataFrame. T6 is the reference column, and T8 onward are assay columns.
+
+    Returns:
+        dict: One NumPy array per statistic, aligned with the assay columns:
+            - 'assays': assay column names
+            - 'total_benign', 'tp_benign', 'fp_benign': benign reference counts
+            - 'total_pathogenic', 'tp_pathogenic', 'fp_pathogenic': pathogenic reference counts
+            - 'sensitivity', 'specificity': overall (minimum of benign and pathogenic) per-assay metrics
+    """
+    return get_assay_summary(df).confusion
+
+def assay_sensitivity_specificity(counts):
+    """
+    Calculates the overall sensitivity and specificity of every assay from its confusion counts.
+    Assays without benign or pathogenic references score 0 for that category, and the overall
+    value is the minimum of the benign and pathogenic values.
+
+    Parameters:
+        counts (dict): Confusion counts as returned by build_assay_confusion_counts. The counts may also be
+                       2-D (replicates x assays), as in bootstrap_batch.
+
+    Returns:
+        tuple: Two NumPy float arrays (sensitivity, specificity), one value per assay column.
+    """
+    def rate(numerator, total):
+        return np.divide(numerator, total, out=np.zeros(np.shape(total)), where=total > 0)
+
+    has_benign = counts["total_benign"] > 0
+    has_pathogenic = counts["total_pathogenic"] > 0
+
+    sensitivity_benign = rate(counts["tp_benign"], counts["total_benign"])
+    sensitivity_pathogenic = rate(counts["tp_pathogenic"], counts["total_pathogenic"])
+    specificity_benign = np.where(has_benign, 1 - rate(counts["fp_benign"], counts["total_benign"]), 0.0)
+    specificity_pathogenic = np.where(has_pathogenic, 1 - rate(counts["fp_pathogenic"], counts["total_pathogenic"]), 0.0)
+
+    # Aggregate sensitivity and specificity
+    sensitivity = np.minimum(sensitivity_benign, sensitivity_pathogenic)
+    specificity = np.minimum(specificity_benign, specificity_pathogenic)
+    return sensitivity, specificity
+
+def count_assays_by_sensitivity_specificity(df, thresholds=(0.5, 0.6, 0.7, 0.8, 0.9, 1.0), counts=None):
     """
     Counts the number of assays that meet specific sensitivity and specificity thresholds.
 
+    Parameters:
+        df (pd.DataFrame or AssaySummary): The input DataFrame. T6 is the reference column, and T8 onward are assay columns.
+        thresholds (sequence): Thresholds for sensitivity and specificity, without repeats.
+        counts (dict, optional): Precomputed confusion counts from build_assay_confusion_counts.
+
+    Returns:
+        dict: A dictionary with sensitivity and specificity thresholds as keys and counts of assays meeting those criteria as values,
+              in the order of thresholds.
+    """
+    thresholds = list(thresholds)
+    if len(set(thresholds)) != len(thresholds):
+        raise ValueError(f"Repeated thresholds: {thresholds}")
+
+    if counts is None:
+        counts = build_assay_confusion_counts(df)
+    return {
+        f"sensitivity_and_specificity_>={threshold}": int(count)
+        for threshold, count in zip(thresholds, assays_meeting_thresholds(counts, thresholds))
+    }
+
+def assays_meeting_thresholds(counts, thresholds):
+    """
+    Counts the assays whose sensitivity and specificity both reach each threshold.
+
+    Parameters:
+        counts (dict): Confusion counts from build_assay_confusion_counts.
+        thresholds (sequence): Thresholds, in any order (repeats allowed).
+
+    Returns:
+        np.ndarray: The number of assays meeting each threshold, in the order of thresholds.
+    """
+    # An assay meets threshold t on both metrics when the smaller of the two is >= t
+    overall = np.sort(np.minimum(counts["sensitivity"], counts["specificity"]))
+    return len(overall) - np.searchsorted(overall, np.asarray(thresholds, dtype=float), side="left")
+
+def sweep_sensitivity_specificity(df, thresholds=1000, counts=None):
+    """
+    Counts the assays meeting every sensitivity/specificity threshold of a grid at once.
+    The per-assay metrics are sorted (or binned) once and the counts are read off with
+    searchsorted and cumulative sums, so the cost barely depends on the grid size.
+
+    Parameters:
+        df (pd.DataFrame or AssaySummary): The input DataFrame. T6 is the reference column, and T8 onward are assay columns.
+        thresholds (int or array-like): Number of evenly spaced thresholds in [0, 1], or the thresholds themselves.
+        counts (dict, optional): Precomputed confusion counts from build_assay_confusion_counts.
+
+    Returns:
+        dict: NumPy arrays over the (sorted) threshold grid:
+            - 'thresholds': the threshold grid
+            - 'assays_meeting_threshold': assays with sensitivity >= t and specificity >= t, for each threshold t
+            - 'histogram': 2-D count of assays by sensitivity bin (rows) and specificity bin (columns), where bin i
+                           holds the metrics in [thresholds[i], thresholds[i + 1]); metrics below the grid are left out
+            - 'assays_meeting_pair': assays with sensitivity >= thresholds[i] and specificity >= thresholds[j]
+    """
+    if np.isscalar(thresholds):
+        thresholds = np.linspace(0, 1, int(thresholds))
+    thresholds = np.unique(np.asarray(thresholds, dtype=float))
+
+    if counts is None:
+        counts = build_assay_confusion_counts(df)
+    sensitivity, specificity = counts["sensitivity"], counts["specificity"]
+
+    assays_meeting_threshold = assays_meeting_thresholds(counts, thresholds)
+
+    # Bin every assay by the largest threshold its sensitivity (specificity) reaches
+    sensitivity_bins = np.searchsorted(thresholds, sensitivity, side="right") - 1
+    specificity_bins = np.searchsorted(thresholds, specificity, side="right") - 1
+    in_grid = (sensitivity_bins >= 0) & (specificity_bins >= 0)
+    size = len(thresholds)
+    histogram = np.bincount(
+        sensitivity_bins[in_grid] * size + specificity_bins[in_grid], minlength=size * size
+    ).reshape(size, size)
+
+    # Reverse cumulative sums over both axes give the assays at or above each pair of thresholds
+    assays_meeting_pair = histogram[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+
+    return {
+        "thresholds": thresholds,
+        "assays_meeting_threshold": assays_meeting_threshold,
+        "histogram": histogram,
+        "assays_meeting_pair": assays_meeting_pair,
+    }
+
+def bootstrap_indicators(df):
+    """
+    Builds the matrices the bootstrap resamples: for the benign (T6 = 1 or 2) and pathogenic (T6 = 4 or 5)
+    reference variants, whether each assay tested the variant, called it 0 and called it 2.
+
     Parameters:
         df (pd.DataFrame): The input DataFrame. T6 is the reference column, and T8 onward are assay columns.
 
     Returns:
-        dict: A dictionary with sensitivity and specificity thresholds as keys and counts of assays meeting those criteria as values.
+        dict: 'benign' and 'pathogenic' lists of (reference variants x assays) float32 matrices:
+              [tested, called 0, called 2]. The matrices are sparse when scipy is available.
     """
-    # Define thresholds for sensitivity and specificity
-    thresholds = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-    result = {f"sensitivity_and_specificity_>={threshold}": 0 for threshold in thresholds}
+    columns = df.columns.str.strip()
+    t6 = pd.Series(df.iloc[:, columns.get_loc("T6")].to_numpy())
+
+    indicators = {}
+    for category, references in [("benign", [1, 2]), ("pathogenic", [4, 5])]:
+        calls = df.iloc[t6.isin(references).to_numpy(), 7:].to_numpy()
+        tested = pd.notna(calls)
+        matrices = [tested, tested & (calls == 0), tested & (calls == 2)]
+        indicators[category] = [
+            sparse.csr_array(matrix.astype(np.float32)) if sparse is not None else matrix.astype(np.float32)
+            for matrix in matrices
+        ]
+    return indicators
+
+def bootstrap_batch(indicators, replicates, seed, thresholds):
+    """
+    Runs one batch of bootstrap replicates. Each replicate redraws the benign and the pathogenic reference
+    variants with replacement (keeping their numbers), expressed as multinomial weights, so the confusion
+    counts of all replicates and assays are a single weights x indicators product per statistic.
 
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
+    Parameters:
+        indicators (dict): Matrices from bootstrap_indicators.
+        replicates (int): Number of replicates in the batch.
+        seed (np.random.SeedSequence or int): Seed of the batch's random generator.
+        thresholds (list): Thresholds of the assay counts.
 
-    # Define mapping for T6 reference values
-    benign_reference = [1, 2]  # T6 values that map to benign (0)
-    pathogenic_reference = [4, 5]  # T6 values that map to pathogenic (2)
+    Returns:
+        tuple: (replicates x assays) float32 sensitivity and specificity, and the
+               (replicates x thresholds) number of assays meeting each threshold.
+    """
+    rng = np.random.default_rng(seed)
+
+    counts = {}
+    for category, (tested, called_benign, called_pathogenic) in indicators.items():
+        n_references = tested.shape[0]
+        if n_references:
+            weights = rng.multinomial(n_references, np.full(n_references, 1 / n_references), size=replicates)
+        else:
+            weights = np.zeros((replicates, 0))
+        weights = weights.astype(np.float32)
+        counts[f"total_{category}"] = np.rint(weights @ tested).astype(np.int64)
+        counts[f"tp_{category}"] = np.rint(weights @ (called_benign if category == "benign" else called_pathogenic)).astype(np.int64)
+        counts[f"fp_{category}"] = np.rint(weights @ (called_pathogenic if category == "benign" else called_benign)).astype(np.int64)
+
+    sensitivity, specificity = assay_sensitivity_specificity(counts)
+    overall = np.minimum(sensitivity, specificity)
+    threshold_counts = np.stack([np.count_nonzero(overall >= threshold, axis=1) for threshold in thresholds], axis=1)
+    return sensitivity.astype(np.float32), specificity.astype(np.float32), threshold_counts
+
+# Indicator matrices of the bootstrap, sent once to each worker process by init_bootstrap_worker
+BOOTSTRAP_INDICATORS = None
+
+def init_bootstrap_worker(indicators):
+    """
+    Keeps the bootstrap indicator matrices in a worker process, so the batches only carry their seeds.
+    """
+    global BOOTSTRAP_INDICATORS
+    BOOTSTRAP_INDICATORS = indicators
 
-    # Iterate through each assay column
-    for col in assay_columns:
-        # Initialize counters for this assay
-        tp_benign = tp_pathogenic = 0
-        total_benign = total_pathogenic = 0
-        tn_benign = tn_pathogenic = 0
-        fp_benign = fn_benign = 0
-        fp_pathogenic = fn_pathogenic = 0
+def run_bootstrap_batch(replicates, seed, thresholds):
+    """
+    Runs bootstrap_batch on the indicator matrices of the worker process.
+    """
+    return bootstrap_batch(BOOTSTRAP_INDICATORS, replicates, seed, thresholds)
 
-        # Evaluate sensitivity and specificity for each assay
-        for _, row in df.iterrows():
-            reference = row['T6']
-            assay_result = row[col]
+def bootstrap_sensitivity_specificity(df, replicates=1000, confidence=0.95, thresholds=(0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+                                      seed=0, batch_size=500, max_workers=None):
+    """
+    Bootstrap confidence intervals for every assay's sensitivity and specificity and for the number of assays
+    meeting each threshold (as counted by count_assays_by_sensitivity_specificity).
+    Replicates are split into batches of batch_size, each with its own child of SeedSequence(seed), so the
+    results only depend on seed and batch_size, not on the number of workers.
 
-            # Skip if assay result is NaN
-            if pd.isna(assay_result):
-                continue
+    Parameters:
+        df (pd.DataFrame): The input DataFrame. T6 is the reference column, and T8 onward are assay columns.
+        replicates (int): Number of bootstrap replicates.
+        confidence (float): Confidence level of the percentile intervals.
+        thresholds (sequence): Sensitivity and specificity thresholds (counts are reported in this order).
+        seed (int): Seed of the resampling.
+        batch_size (int): Replicates per batch (bounds memory to batch_size x assays per statistic).
+        max_workers (int, optional): Run the batches in a process pool of this size (default: in this process);
+                                     the indicator matrices are sent once to each worker.
 
-            # Evaluate sensitivity and specificity
-            if reference in benign_reference:
-                total_benign += 1
-                if assay_result == 0:  # True Positive for benign
-                    tp_benign += 1
-                elif assay_result == 2:  # False Positive for benign
-                    fp_benign += 1
-            elif reference in pathogenic_reference:
-                total_pathogenic += 1
-                if assay_result == 2:  # True Positive for pathogenic
-                    tp_pathogenic += 1
-                elif assay_result == 0:  # False Positive for pathogenic
-                    fp_pathogenic += 1
-
-        # Calculate sensitivity and specificity for this assay
-        sensitivity_benign = tp_benign / total_benign if total_benign > 0 else 0
-        sensitivity_pathogenic = tp_pathogenic / total_pathogenic if total_pathogenic > 0 else 0
-        specificity_benign = 1 - (fp_benign / total_benign) if total_benign > 0 else 0
-        specificity_pathogenic = 1 - (fp_pathogenic / total_pathogenic) if total_pathogenic > 0 else 0
-
-        # Aggregate sensitivity and specificity
-        overall_sensitivity = min(sensitivity_benign, sensitivity_pathogenic)
-        overall_specificity = min(specificity_benign, specificity_pathogenic)
-
-        # Check if this assay meets each threshold
-        for threshold in thresholds:
-            if overall_sensitivity >= threshold and overall_specificity >= threshold:
-                result[f"sensitivity_and_specificity_>={threshold}"] += 1
-
-    return result
+    Returns:
+        dict:
+            - 'assays': assay column names
+            - 'sensitivity', 'specificity': point estimates per assay
+            - 'sensitivity_ci', 'specificity_ci': (assays x 2) lower and upper bounds
+            - 'thresholds', 'threshold_counts': point estimates of the assay counts per threshold
+            - 'threshold_counts_ci': (thresholds x 2) lower and upper bounds
+    """
+    thresholds = list(thresholds)
+    counts = build_assay_confusion_counts(df)
+    indicators = bootstrap_indicators(df)
+
+    batches = [min(batch_size, replicates - start) for start in range(0, replicates, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    if max_workers is None:
+        results = list(map(partial(bootstrap_batch, indicators, thresholds=thresholds), batches, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_bootstrap_worker,
+                                 initargs=(indicators,)) as executor:
+            results = list(executor.map(partial(run_bootstrap_batch, thresholds=thresholds), batches, seeds))
+
+    sensitivity = np.concatenate([result[0] for result in results])
+    specificity = np.concatenate([result[1] for result in results])
+    threshold_counts = np.concatenate([result[2] for result in results])
+
+    # Percentile intervals
+    tail = (1 - confidence) / 2 * 100
+    percentiles = [tail, 100 - tail]
+
+    return {
+        "assays": counts["assays"],
+        "sensitivity": counts["sensitivity"],
+        "specificity": counts["specificity"],
+        "sensitivity_ci": np.percentile(sensitivity, percentiles, axis=0).T,
+        "specificity_ci": np.percentile(specificity, percentiles, axis=0).T,
+        "thresholds": thresholds,
+        "threshold_counts": assays_meeting_thresholds(counts, thresholds),
+        "threshold_counts_ci": np.percentile(threshold_counts, percentiles, axis=0).T,
+    }
 
 def count_tracks_by_tested_variants(df):
     """
@@ -78,19 +935,14 @@ def count_tracks_by_tested_variants(df):
     2) Tracks that meet the above criteria and have tested 10 or more variants in total.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: Two dictionaries:
             - Tracks meeting criteria for 1 benign and 1 pathogenic variants, up to 5 each.
             - Tracks meeting the same criteria with at least 10 total variants tested.
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Split the dataframe into benign and pathogenic variants based on T6 values
-    benign_variants = df[df["T6"].isin([1, 2])]  # T6 = 1 or 2 for benign
-    pathogenic_variants = df[df["T6"].isin([4, 5])]  # T6 = 4 or 5 for pathogenic
+    summary = get_assay_summary(df)
 
     # Initialize dictionaries to store the results
     criteria_dict = {}
@@ -98,18 +950,15 @@ def count_tracks_by_tested_variants(df):
 
     for threshold in range(1, 6):  # Thresholds for 1 to 5 benign/pathogenic variants
         # Filter tracks that meet the benign and pathogenic thresholds
-        tracks_meeting_criteria = (benign_variants[assay_columns].notna().sum(axis=0) >= threshold) & \
-                                  (pathogenic_variants[assay_columns].notna().sum(axis=0) >= threshold)
-        count_meeting_criteria = tracks_meeting_criteria.sum()
+        tracks_meeting_criteria = (summary.benign_test_counts >= threshold) & \
+                                  (summary.pathogenic_test_counts >= threshold)
 
         # Filter tracks meeting the additional total variants threshold (10 or more)
-        total_variants_tested = df[assay_columns].notna().sum(axis=0)
-        tracks_meeting_criteria_with_total = tracks_meeting_criteria & (total_variants_tested >= 10)
-        count_meeting_criteria_with_total = tracks_meeting_criteria_with_total.sum()
+        tracks_meeting_criteria_with_total = tracks_meeting_criteria & (summary.assay_test_counts >= 10)
 
         # Store results in the dictionaries
-        criteria_dict[threshold] = count_meeting_criteria
-        criteria_with_total_dict[threshold] = count_meeting_criteria_with_total
+        criteria_dict[threshold] = tracks_meeting_criteria.sum()
+        criteria_with_total_dict[threshold] = tracks_meeting_criteria_with_total.sum()
 
     return criteria_dict, criteria_with_total_dict
 
@@ -119,32 +968,17 @@ def count_assays_by_t6_categories(df):
     (benign, pathogenic), based on T6 values.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: Two ordered dictionaries:
             - Benign distribution (T6 = 1 or 2)
             - Pathogenic distribution (T6 = 4 or 5)
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Split the dataframe into categories based on T6 values
-    benign_variants = df[df["T6"].isin([1, 2])]
-    pathogenic_variants = df[df["T6"].isin([4, 5])]
+    summary = get_assay_summary(df)
 
-    # Helper function to calculate the distribution for a given category
-    def calculate_distribution(category_df):
-        # Count the number of non-NaN values for each assay column
-        assay_test_counts = category_df[assay_columns].notna().sum(axis=0)
-        # Count the frequency of each unique number of variants tested
-        distribution = assay_test_counts.value_counts().to_dict()
-        # Order the dictionary by the number of variants tested (keys)
-        return OrderedDict(sorted(distribution.items()))
-
-    # Calculate distributions for each category
-    benign_distribution = calculate_distribution(benign_variants)
-    pathogenic_distribution = calculate_distribution(pathogenic_variants)
+    benign_distribution = ordered_distribution(summary.benign_test_counts)
+    pathogenic_distribution = ordered_distribution(summary.pathogenic_test_counts)
 
     return benign_distribution, pathogenic_distribution
 
@@ -155,24 +989,12 @@ def count_assays_by_variants_tested(df):
     that tested that specific number of variants, ordered by the number of variants tested.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: An ordered dictionary where keys are the number of variants tested and values are the count of assays.
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Count the number of non-NaN values for each assay column
-    assay_test_counts = df[assay_columns].notna().sum(axis=0)
-
-    # Count the frequency of each unique number of variants tested
-    distribution = assay_test_counts.value_counts().to_dict()
-
-    # Order the dictionary by the number of variants tested (keys)
-    ordered_distribution = OrderedDict(sorted(distribution.items()))
-
-    return ordered_distribution
+    return ordered_distribution(get_assay_summary(df).assay_test_counts)
 
 def number_of_vus_variants_tests(df):
     """
@@ -180,24 +1002,13 @@ def number_of_vus_variants_tests(df):
     A VUS variant must have a NaN value in the T6 column.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: A dictionary where keys are the number of tests and values are the count of VUS variants.
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Filter variants with a NaN value in T6
-    vus_variants = df[df["T6"].isna()]
-
-    # Count the number of non-NaN values for each VUS variant
-    test_counts = vus_variants[assay_columns].notna().sum(axis=1)
-
     # Create the dictionary, including variants tested 0 times
-    test_distribution = test_counts.value_counts().sort_index().to_dict()
-
-    return test_distribution
+    return get_assay_summary(df).vus_test_distribution
 
 # Create a dictionary for the number of tests for reference panel variants
 def number_of_reference_variants_tests(df):
@@ -206,44 +1017,26 @@ def number_of_reference_variants_tests(df):
     A reference panel variant must have a non-NaN value in the T6 column.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: A dictionary where keys are the number of tests and values are the count of reference panel variants.
     """
-    # Select assay columns (from T8 onward) 
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-    # Filter variants with a non-NaN value in T6
-    reference_variants = df[df["T6"].notna()]
-
-    # Count the number of non-NaN values for each reference variant
-    test_counts = reference_variants[assay_columns].notna().sum(axis=1)
-
     # Create the dictionary, including variants tested 0 times
-    test_distribution = test_counts.value_counts().sort_index().to_dict()
-
-    return test_distribution
+    return get_assay_summary(df).reference_test_distribution
 
 def number_of_independent_tests(df):
     """
     Calculates the distribution of variants based on the number of times they were tested.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         dict: A dictionary where keys are the number of tests and values are the count of variants.
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Count the number of non-NaN values for each variant
-    test_counts = df[assay_columns].notna().sum(axis=1)
-
     # Create the dictionary, including variants tested 0 times
-    test_distribution = test_counts.value_counts().sort_index().to_dict()
-
-    return test_distribution
+    return get_assay_summary(df).variant_test_distribution
 
 def sum_assays_tested(df):
     """
@@ -252,21 +1045,12 @@ def sum_assays_tested(df):
     and sums these counts across all rows.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         int: The total number of assays that tested the variants.
     """
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
- 
-    # Count the number of non-NaN values for each row in the assay columns
-    row_counts = df[assay_columns].notna().sum(axis=1)
-
-    # Sum the counts across all rows
-    total_assays_tested = row_counts.sum()
-
-    return total_assays_tested
+    return get_assay_summary(df).total_tests
 
 def count_documented_tested_variants(df):
     """
@@ -275,27 +1059,12 @@ def count_documented_tested_variants(df):
     2. Tested (have at least one non-NaN value in the assay columns starting from T8).
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         int: The total number of variants that meet the criteria.
     """
-    # Ensure column names are standardized
-    df.columns = df.columns.str.strip()
-
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Filter rows where T7 == 1 (documented variants)
-    documented_variants = df[df["T7"] == 1]
-
-    # Check if any assay result (T8 onward) is non-NaN for documented variants
-    tested_variants = documented_variants[assay_columns].notna().any(axis=1)
-
-    # Count the number of documented and tested variants
-    total_documented_tested_variants = tested_variants.sum()
-
-    return total_documented_tested_variants
+    return get_assay_summary(df).documented_tested
 
 def count_reference_variants_tested(df):
     """
@@ -304,30 +1073,12 @@ def count_reference_variants_tested(df):
     2. Have a value in column T6.
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         int: The total number of variants that meet the criteria.
     """
-    # Ensure column names are standardized
-    df.columns = df.columns.str.strip()
-
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Check if the variant was tested (any non-NaN value in the assay columns)
-    tested_variants = df[assay_columns].notna().any(axis=1)
-
-    # Check if T6 has a value
-    has_t6_value = df["T6"].notna()
-
-    # Combine both conditions
-    variants_with_t6_and_tested = (tested_variants & has_t6_value)
-
-    # Count the number of variants that satisfy both conditions
-    total_variants_tested_with_t6 = variants_with_t6_and_tested.sum()
-
-    return total_variants_tested_with_t6
+    return get_assay_summary(df).reference_tested
 
 def count_documented_without_t6_and_tested(df):
     """
@@ -337,178 +1088,288 @@ def count_documented_without_t6_and_tested(df):
     3. Tested (have at least one non-NaN value in the assay columns starting from T8).
 
     Parameters:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
 
     Returns:
         int: The total number of variants that meet the criteria.
     """
-    # Ensure column names are standardized
-    df.columns = df.columns.str.strip()
-
-    # Select assay columns (from T8 onward)
-    assay_columns = df.columns[7:]  # Skip the first 7 metadata columns (T1 to T7)
-
-    # Filter rows where T7 == 1 (documented variants)
-    documented_variants = df[df["T7"] == 1]
-
-    # Check if T6 is NaN
-    without_t6 = documented_variants["T6"].isna()
-
-    # Check if any assay result (T8 onward) is non-NaN for documented variants
-    tested_variants = documented_variants[assay_columns].notna().any(axis=1)
-
-    # Combine both conditions
-    documented_without_t6_and_tested = (without_t6 & tested_variants)
-
-    # Count the number of variants that satisfy both conditions
-    total_documented_without_t6_and_tested = documented_without_t6_and_tested.sum()
-
-    return total_documented_without_t6_and_tested
-
-# File path
-file_path = "SUPP_TABLES_BRCA12_JAN_2025_V14.xlsx"
-
-# Load "Sup Table 1" and set the second row as column headers
-sheet_name = "Sup Table 1"
-BRCA1_df = pd.read_excel(
-    file_path, 
-    sheet_name=sheet_name, 
-    engine="openpyxl", 
-    skiprows=1  # Skip the first row (metadata)
-)
-
-# Load "Sup Table 2" and set the second row as column headers
-sheet_name = "Sup Table 2"
-BRCA2_df = pd.read_excel(
-    file_path, 
-    sheet_name=sheet_name, 
-    engine="openpyxl", 
-    skiprows=1  # Skip the first row (metadata)
-)
-
-# Calculate the total number of assays that tested the variants
-BRCA1_total_assays_tested = sum_assays_tested(BRCA1_df)
-BRCA2_total_assays_tested = sum_assays_tested(BRCA2_df)
-
-# Calculate the total documented tested variants
-BRCA1_documented_tested_variants = count_documented_tested_variants(BRCA1_df)
-BRCA2_documented_tested_variants = count_documented_tested_variants(BRCA2_df)
-
-# Calculate the total variants tested with T6
-BRCA1_reference_variants_tested = count_reference_variants_tested(BRCA1_df)
-BRCA2_reference_variants_tested = count_reference_variants_tested(BRCA2_df)
-
-# Calculate the total documented variants without T6 and tested
-BRCA1_documented_without_t6_and_tested = count_documented_without_t6_and_tested(BRCA1_df)
-BRCA2_documented_without_t6_and_tested = count_documented_without_t6_and_tested(BRCA2_df)
-
-# Calculate the number of independent tests for BRCA1 and BRCA2
-BRCA1_test_distribution = number_of_independent_tests(BRCA1_df)
-BRCA2_test_distribution = number_of_independent_tests(BRCA2_df)
-
-# Calculate the number of tests for reference variants in BRCA1 and BRCA2
-BRCA1_reference_test_distribution = number_of_reference_variants_tests(BRCA1_df)
-BRCA2_reference_test_distribution = number_of_reference_variants_tests(BRCA2_df)
-
-# Calculate the number of tests for VUS variants in BRCA1 and BRCA2
-BRCA1_vus_test_distribution = number_of_vus_variants_tests(BRCA1_df)
-BRCA2_vus_test_distribution = number_of_vus_variants_tests(BRCA2_df)
-
-# Calculate the distribution of assays grouped by the number of variants tested for BRCA1 and BRCA2
-BRCA1_assays_distribution = count_assays_by_variants_tested(BRCA1_df)
-BRCA2_assays_distribution = count_assays_by_variants_tested(BRCA2_df)
-
-# Calculate the distributions for BRCA1 and BRCA2
-BRCA1_benign_dist, BRCA1_pathogenic_dist = count_assays_by_t6_categories(BRCA1_df)
-BRCA2_benign_dist, BRCA2_pathogenic_dist = count_assays_by_t6_categories(BRCA2_df)
-
-BRCA1_criteria, BRCA1_criteria_with_total = count_tracks_by_tested_variants(BRCA1_df)
-BRCA2_criteria, BRCA2_criteria_with_total = count_tracks_by_tested_variants(BRCA2_df)
-
-BRCA1_threshold_counts = count_assays_by_sensitivity_specificity(BRCA1_df)
-BRCA2_threshold_counts = count_assays_by_sensitivity_specificity(BRCA2_df)
-
-# Print results for BRCA1
-print("BRCA1 - Total number of assays that tested the variants:", BRCA1_total_assays_tested)
-print("BRCA1 - Total documented tested variants:", BRCA1_documented_tested_variants)
-print("BRCA1 - Total reference variants tested:", BRCA1_reference_variants_tested)
-print("BRCA1 - Total documented variants VUS and tested:", BRCA1_documented_without_t6_and_tested)
-print("BRCA1 - Number of independent tests:", BRCA1_test_distribution)
-print("BRCA1 - Number of reference variants tests:", BRCA1_reference_test_distribution)
-print("BRCA1 - Number of VUS variants tests:", BRCA1_vus_test_distribution)
-print("BRCA1 - Distribution of assays by the number of variants tested:", BRCA1_assays_distribution)
-print("BRCA1 - Benign distribution of assays by the number of variants tested:", BRCA1_benign_dist)
-print("BRCA1 - Pathogenic distribution of assays by the number of variants tested:", BRCA1_pathogenic_dist)
-print("BRCA1 - Tracks meeting criteria [x benign and x pathogenic]:", BRCA1_criteria)
-print("BRCA1 - Tracks meeting criteria [x benign and x pathogenic] with 10+ total variants:", BRCA1_criteria_with_total)
-print("BRCA1 - Assay Counts by Threshold:", BRCA1_threshold_counts)
-
-# Print results for BRCA2
-print("BRCA2 - Total number of assays that tested the variants:", BRCA2_total_assays_tested)
-print("BRCA2 - Total documented tested variants:", BRCA2_documented_tested_variants)
-print("BRCA2 - Total reference variants tested:", BRCA2_reference_variants_tested)
-print("BRCA2 - Total documented variants VUS and tested:", BRCA2_documented_without_t6_and_tested)
-print("BRCA2 - Number of independent tests:", BRCA2_test_distribution)
-print("BRCA2 - Number of reference variants tests:", BRCA2_reference_test_distribution)
-print("BRCA2 - Number of VUS variants tests:", BRCA2_vus_test_distribution)
-print("BRCA2 - Distribution of assays by the number of variants tested:", BRCA2_assays_distribution)
-print("BRCA2 - Benign distribution of assays by the number of variants tested:", BRCA2_benign_dist)
-print("BRCA2 - Pathogenic distribution of assays by the number of variants tested:", BRCA2_pathogenic_dist)
-print("BRCA2 - Tracks meeting criteria [x benign and x pathogenic]:", BRCA2_criteria)
-print("BRCA2 - Tracks meeting criteria [x benign and x pathogenic] with 10+ total variants:", BRCA2_criteria_with_total)
-print("BRCA2 - Assay Counts by Threshold:", BRCA2_threshold_counts)
-
-# Data for BRCA1
-brca1_data = {
-    "BRCA1 - Total number of assays that tested the variants": BRCA1_total_assays_tested,
-    "BRCA1 - Total documented tested variants": BRCA1_documented_tested_variants,
-    "BRCA1 - Total reference variants tested": BRCA1_reference_variants_tested,
-    "BRCA1 - Total documented variants VUS and tested": BRCA1_documented_without_t6_and_tested,
-    "BRCA1 - Number of independent tests": BRCA1_test_distribution,
-    "BRCA1 - Number of reference variants tests": BRCA1_reference_test_distribution,
-    "BRCA1 - Number of VUS variants tests": BRCA1_vus_test_distribution,
-    "BRCA1 - Distribution of assays by the number of variants tested": BRCA1_assays_distribution,
-    "BRCA1 - Benign distribution of assays by the number of variants tested": BRCA1_benign_dist,
-    "BRCA1 - Pathogenic distribution of assays by the number of variants tested": BRCA1_pathogenic_dist,
-    "BRCA1 - Tracks meeting criteria [x benign and x pathogenic]": BRCA1_criteria,
-    "BRCA1 - Tracks meeting criteria [x benign and x pathogenic] with 10+ total variants": BRCA1_criteria_with_total,
-    "BRCA1 - Assay Counts by Threshold": BRCA1_threshold_counts,
-}
-
-# Data for BRCA2
-brca2_data = {
-    "BRCA2 - Total number of assays that tested the variants": BRCA2_total_assays_tested,
-    "BRCA2 - Total documented tested variants": BRCA2_documented_tested_variants,
-    "BRCA2 - Total reference variants tested": BRCA2_reference_variants_tested,
-    "BRCA2 - Total documented variants VUS and tested": BRCA2_documented_without_t6_and_tested,
-    "BRCA2 - Number of independent tests": BRCA2_test_distribution,
-    "BRCA2 - Number of reference variants tests": BRCA2_reference_test_distribution,
-    "BRCA2 - Number of VUS variants tests": BRCA2_vus_test_distribution,
-    "BRCA2 - Distribution of assays by the number of variants tested": BRCA2_assays_distribution,
-    "BRCA2 - Benign distribution of assays by the number of variants tested": BRCA2_benign_dist,
-    "BRCA2 - Pathogenic distribution of assays by the number of variants tested": BRCA2_pathogenic_dist,
-    "BRCA2 - Tracks meeting criteria [x benign and x pathogenic]": BRCA2_criteria,
-    "BRCA2 - Tracks meeting criteria [x benign and x pathogenic] with 10+ total variants": BRCA2_criteria_with_total,
-    "BRCA2 - Assay Counts by Threshold": BRCA2_threshold_counts,
-}
-
-# Create an Excel writer
-with pd.ExcelWriter("BRCA_Results_2025_V3.xlsx", engine="xlsxwriter") as writer:
-    # Function to write structured data to an Excel sheet
-    def write_to_excel(data, sheet_name):
-        rows = []
+    return get_assay_summary(df).documented_vus_tested
+
+def read_sheet(file_path, sheet_name):
+    """
+    Reads a Sup Table sheet from the workbook, using the second row as column headers.
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+
+    Returns:
+        pd.DataFrame: The sheet contents.
+    """
+    return pd.read_excel(
+        file_path, 
+        sheet_name=sheet_name, 
+        engine="openpyxl", 
+        skiprows=1  # Skip the first row (metadata)
+    )
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Calculates the SHA-256 digest of a file's contents.
+
+    Parameters:
+        file_path (str): Path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def sheet_cache_path(file_path, sheet_name, cache_dir=CACHE_DIR):
+    """
+    Returns the file name prefix of a sheet's Arrow copies and the path of the copy of the current workbook.
+    """
+    workbook = os.path.splitext(os.path.basename(file_path))[0]
+    prefix = f"{workbook}.{sheet_name.replace(' ', '_')}."
+    return prefix, os.path.join(cache_dir, f"{prefix}{file_digest(file_path)[:16]}.arrow")
+
+def load_sheet(file_path, sheet_name, cache_dir=CACHE_DIR):
+    """
+    Loads a Sup Table sheet through an on-disk Arrow cache keyed by the workbook's content hash.
+    The first load parses the workbook and stores the sheet as an uncompressed Feather file; later loads
+    memory-map that file. Editing the workbook changes the hash, so stale copies are replaced automatically.
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+        cache_dir (str): Directory for the cached sheets.
+
+    Returns:
+        pd.DataFrame: The sheet contents, identical to read_sheet.
+    """
+    if feather is None:
+        return read_sheet(file_path, sheet_name)
+
+    prefix, cache_path = sheet_cache_path(file_path, sheet_name, cache_dir)
+    if os.path.exists(cache_path):
+        return feather.read_table(cache_path, memory_map=True).to_pandas()
+
+    df = read_sheet(file_path, sheet_name)
+
+    # Drop copies of earlier versions of this sheet, then write the new one atomically
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix):
+            os.remove(os.path.join(cache_dir, name))
+    try:
+        feather.write_feather(df, cache_path + ".tmp", compression="uncompressed")
+        os.replace(cache_path + ".tmp", cache_path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as error:
+        # Sheets Arrow cannot represent (e.g. mixed-type columns) are simply not cached
+        print(f"Could not cache {sheet_name}: {error}")
+        if os.path.exists(cache_path + ".tmp"):
+            os.remove(cache_path + ".tmp")
+
+    return df
+
+def load_sparse_sheet(file_path, sheet_name, cache_dir=CACHE_DIR, chunk_size=1000):
+    """
+    Loads a Sup Table sheet for SparseAssaySummary without building the dense assay block: the T1-T7 metadata
+    as a DataFrame and the assay calls as a CSC matrix of call codes. The calls are read one column at a time
+    from the memory-mapped Arrow copy of the sheet when load_sheet has cached one, and otherwise gathered
+    chunk by chunk while streaming the workbook with openpyxl (twice if numbers stored as text need to be
+    converted, as in StreamingAssaySummary).
+
+    Parameters:
+        file_path (str): Path to the Excel workbook.
+        sheet_name (str): Name of the sheet to read.
+        cache_dir (str): Directory of the cached sheets.
+        chunk_size (int): Number of rows streamed at a time.
+
+    Returns:
+        tuple: (metadata DataFrame, scipy.sparse.csc_array of call codes, assay names).
+    """
+    if sparse is None:
+        raise ImportError("load_sparse_sheet requires scipy")
+
+    cache_path = sheet_cache_path(file_path, sheet_name, cache_dir)[1] if feather is not None else None
+    if cache_path is not None and os.path.exists(cache_path):
+        table = feather.read_table(cache_path, memory_map=True)
+        metadata = table.select(range(7)).to_pandas()
+        columns = (table.column(position).to_pandas() for position in range(7, table.num_columns))
+        calls = sparse_calls_from_columns(columns, table.num_rows)
+        names = table.column_names
+    else:
+        names, metadata, calls, texts, others = stream_sparse_calls(file_path, sheet_name, chunk_size, {})
+        conversions = numeric_conversions(texts, others)
+        if conversions:
+            names, metadata, calls, texts, others = stream_sparse_calls(file_path, sheet_name, chunk_size,
+                                                                        conversions)
+
+    assays = np.asarray(pd.Index(names).str.strip()[7:])
+    return metadata, calls, assays
+
+def stream_sparse_calls(file_path, sheet_name, chunk_size, conversions):
+    """
+    Streams a sheet into its T1-T7 metadata and CSC call codes for load_sparse_sheet (see read_chunk).
+
+    Returns:
+        tuple: (column names, metadata DataFrame, scipy.sparse.csc_array of call codes,
+                the texts and others recorded by read_chunk).
+    """
+    chunks = stream_sheet(file_path, sheet_name, chunk_size)
+    names = next(chunks)
+    texts, others = {}, set()
+    metadata_rows = []
+    rows, assays, data = [], [], []
+    n_variants = 0
+    for chunk in chunks:
+        values, missing = read_chunk(chunk, len(names), conversions, texts, others)
+        metadata_rows.extend(np.where(missing[:, :7], None, values[:, :7]).tolist())
+
+        # Tested cells of the chunk, as (row, assay, code) triplets
+        chunk_rows, chunk_assays = np.nonzero(~missing[:, 7:])
+        rows.append((n_variants + chunk_rows).astype(np.int32))
+        assays.append(chunk_assays.astype(np.int32))
+        data.append(call_codes(values[chunk_rows, 7 + chunk_assays]))
+        n_variants += len(chunk)
+
+    metadata = pd.DataFrame(metadata_rows, columns=names[:7])
+    calls = sparse.csc_array(
+        (np.concatenate(data or [np.zeros(0, dtype=np.int8)]),
+         (np.concatenate(rows or [np.zeros(0, dtype=np.int32)]),
+          np.concatenate(assays or [np.zeros(0, dtype=np.int32)]))),
+        shape=(n_variants, len(names) - 7),
+    )
+    return names, metadata, calls, texts, others
+
+def compute_statistics(df, gene):
+    """
+    Computes the full statistic suite for one gene's sheet.
+
+    Parameters:
+        df (pd.DataFrame or AssaySummary): The input DataFrame.
+        gene (str): Gene label used as the prefix of every metric name.
+
+    Returns:
+        dict: Metric names mapped to their values (numbers or dictionaries), in report order.
+    """
+    summary = get_assay_summary(df)
+    benign_dist, pathogenic_dist = count_assays_by_t6_categories(summary)
+    criteria, criteria_with_total = count_tracks_by_tested_variants(summary)
+
+    return {
+        f"{gene} - Total number of assays that tested the variants": sum_assays_tested(summary),
+        f"{gene} - Total documented tested variants": count_documented_tested_variants(summary),
+        f"{gene} - Total reference variants tested": count_reference_variants_tested(summary),
+        f"{gene} - Total documented variants VUS and tested": count_documented_without_t6_and_tested(summary),
+        f"{gene} - Number of independent tests": number_of_independent_tests(summary),
+        f"{gene} - Number of reference variants tests": number_of_reference_variants_tests(summary),
+        f"{gene} - Number of VUS variants tests": number_of_vus_variants_tests(summary),
+        f"{gene} - Distribution of assays by the number of variants tested": count_assays_by_variants_tested(summary),
+        f"{gene} - Benign distribution of assays by the number of variants tested": benign_dist,
+        f"{gene} - Pathogenic distribution of assays by the number of variants tested": pathogenic_dist,
+        f"{gene} - Tracks meeting criteria [x benign and x pathogenic]": criteria,
+        f"{gene} - Tracks meeting criteria [x benign and x pathogenic] with 10+ total variants": criteria_with_total,
+        f"{gene} - Assay Counts by Threshold": count_assays_by_sensitivity_specificity(summary),
+    }
+
+def run_report_job(job, streaming=False, incremental=False, sparse=False):
+    """
+    Summarizes one sheet and computes its statistics. Runs in a worker process of run_report.
+
+    Parameters:
+        job (tuple): (workbook path, sheet name, gene label).
+        streaming (bool): Stream the sheet with openpyxl instead of loading it into a DataFrame.
+        incremental (bool): Reuse the cached aggregates of unchanged assay columns.
+        sparse (bool): Hold the assay calls in a sparse matrix.
+
+    Returns:
+        tuple: The gene label and its statistics from compute_statistics.
+    """
+    file_path, sheet_name, gene = job
+    summary = summarize_sheet(file_path, sheet_name, streaming=streaming, incremental=incremental, sparse=sparse)
+    return gene, compute_statistics(summary, gene)
+
+def write_to_excel(writer, data, sheet_name):
+    """
+    Writes one gene's statistics to an Excel sheet as Metric/Key/Value rows;
+    dictionary values are expanded to one row per key.
+
+    Parameters:
+        writer (pd.ExcelWriter): The open Excel writer.
+        data (dict): Metric names mapped to their values.
+        sheet_name (str): Name of the sheet to write.
+    """
+    rows = []
+    for title, value in data.items():
+        if isinstance(value, dict):
+            for k, v in value.items():
+                rows.append([title, k, v])
+        else:
+            rows.append([title, None, value])
+
+    # Create DataFrame from rows
+    df = pd.DataFrame(rows, columns=["Metric", "Key", "Value"])
+    # Write DataFrame to the Excel sheet
+    df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=0)
+
+def run_report(jobs, output_path, streaming=False, incremental=False, sparse=False, max_workers=None):
+    """
+    Computes the statistics of several (workbook, sheet, gene) jobs in a process pool and writes them
+    to a multi-sheet Excel file, one sheet per gene in job order. Gene labels name the output sheets,
+    so they must be unique.
+
+    Parameters:
+        jobs (list): (workbook path, sheet name, gene label) tuples.
+        output_path (str): Path of the Excel file to write.
+        streaming (bool): Stream the sheets with openpyxl instead of loading them into DataFrames.
+        incremental (bool): Reuse the cached aggregates of unchanged assay columns.
+        sparse (bool): Hold the assay calls in sparse matrices.
+        max_workers (int, optional): Number of worker processes (default: one per job, up to the CPU count).
+
+    Returns:
+        dict: Gene labels mapped to their statistics, in job order (empty, and no file written, without jobs).
+    """
+    genes = [gene for _, _, gene in jobs]
+    duplicates = sorted({gene for gene in genes if genes.count(gene) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate gene labels in jobs: {duplicates}")
+    if not jobs:
+        return {}
+
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(executor.map(partial(run_report_job, streaming=streaming, incremental=incremental, sparse=sparse), jobs))
+
+    # Create an Excel writer
+    with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+        for gene, data in results.items():
+            write_to_excel(writer, data, gene)
+
+    return results
+
+if __name__ == "__main__":
+    # File path
+    file_path = "SUPP_TABLES_BRCA12_JAN_2025_V14.xlsx"
+
+    # (workbook, sheet, gene) jobs; add PALB2/ATM sheets here
+    jobs = [
+        (file_path, "Sup Table 1", "BRCA1"),
+        (file_path, "Sup Table 2", "BRCA2"),
+    ]
+
+    results = run_report(jobs, "BRCA_Results_2025_V3.xlsx", streaming=STREAMING, incremental=INCREMENTAL,
+                         sparse=SPARSE)
+
+    # Print results for each gene
+    for data in results.values():
         for title, value in data.items():
-            if isinstance(value, dict):
-                for k, v in value.items():
-                    rows.append([title, k, v])
-            else:
-                rows.append([title, None, value])
-
-        # Create DataFrame from rows
-        df = pd.DataFrame(rows, columns=["Metric", "Key", "Value"])
-        # Write DataFrame to the Excel sheet
-        df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=0)
-
-    # Write BRCA1 and BRCA2 data
-    write_to_excel(brca1_data, "BRCA1")
-    write_to_excel(brca2_data, "BRCA2")
\ No newline at end of file
+            print(f"{title}:", value)
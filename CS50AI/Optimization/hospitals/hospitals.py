@@ -1,4 +1,11 @@
+import copy
+import math
 import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
 
 
 class Space():
@@ -11,39 +18,102 @@ class Space():
         self.houses = set()
         self.hospitals = set()
 
+        # Occupancy bitmap of houses and hospitals, and an index of the free
+        # cells (row * width + col): free_cells[:free_count] are the free
+        # cells and positions[cell] is a free cell's place in that list
+        self.occupied = np.zeros((height, width), dtype=bool)
+        self.occupied_view = memoryview(self.occupied.reshape(-1))
+        self.free_cells = np.arange(height * width)
+        self.positions = np.arange(height * width)
+        self.free_count = height * width
+
+        # Houses as a (houses x 2) array, rebuilt when a house is added
+        self.house_array = None
+
+        # Distances from every house to every current hospital, and each
+        # house's nearest and second-nearest hospital
+        self.columns = {}
+        self.distance_table = None
+        self.nearest = None
+        self.nearest_distance = None
+        self.second_distance = None
+        self.cost = None
+
+        # Evaluations and best cost over time of the last search
+        self.trace = None
+
+        # Image renderer, created on first use
+        self.renderer = None
+
+    def __getstate__(self):
+        """Drops the bitmap's memoryview and the renderer, which cannot be pickled."""
+        state = self.__dict__.copy()
+        del state["occupied_view"]
+        state["renderer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.occupied_view = memoryview(self.occupied.reshape(-1))
+
     def add_house(self, row, col):
         """Add a house at a particular location in state space."""
         self.houses.add((row, col))
+        self.house_array = None
+        self.occupy((row, col))
 
     def available_spaces(self):
         """Returns all cells not currently used by a house or hospital."""
-
-        # Consider all possible cells
-        candidates = set(
-            (row, col)
-            for row in range(self.height)
-            for col in range(self.width)
-        )
-
-        # Remove all houses and hospitals
-        for house in self.houses:
-            candidates.remove(house)
-        for hospital in self.hospitals:
-            candidates.remove(hospital)
-        return candidates
-
-    def hill_climb(self, maximum=None, image_prefix=None, log=False):
-        """Performs hill-climbing to find a solution."""
+        cells = self.free_cells[:self.free_count].tolist()
+        return set(divmod(cell, self.width) for cell in cells)
+
+    def occupy(self, cell):
+        """Marks a cell as used and removes it from the free-cell index."""
+        row, col = cell
+        if self.occupied[row, col]:
+            return
+        self.occupied[row, col] = True
+
+        # Move the last free cell into the freed slot
+        index = row * self.width + col
+        position = self.positions[index]
+        self.free_count -= 1
+        last = self.free_cells[self.free_count]
+        self.free_cells[position] = last
+        self.positions[last] = position
+
+    def release(self, cell):
+        """Marks a cell as free and adds it back to the free-cell index."""
+        row, col = cell
+        if not self.occupied[row, col]:
+            return
+        self.occupied[row, col] = False
+
+        index = row * self.width + col
+        self.free_cells[self.free_count] = index
+        self.positions[index] = self.free_count
+        self.free_count += 1
+
+    def random_free_cell(self):
+        """Returns a random cell not used by a house or hospital."""
+        cell = self.free_cells[random.randrange(self.free_count)]
+        return divmod(int(cell), self.width)
+
+    def hill_climb(self, maximum=None, image_prefix=None, log=False,
+                   animation=None):
+        """Performs hill-climbing to find a solution.
+
+        image_prefix saves every state as a numbered PNG; animation
+        saves them all as one animated GIF or PNG file instead.
+        """
         count = 0
 
         # Start by initializing hospitals randomly
-        self.hospitals = set()
-        for i in range(self.num_hospitals):
-            self.hospitals.add(random.choice(list(self.available_spaces())))
+        self.place_random_hospitals()
+        self.trace = SearchTrace("hill_climb", self.cost)
         if log:
-            print("Initial state: cost", self.get_cost(self.hospitals))
-        if image_prefix:
-            self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
+            print("Initial state: cost", self.cost)
+        self.output_frame(count, image_prefix, animation)
 
         # Continue until we reach maximum number of iterations
         while maximum is None or count < maximum:
@@ -54,38 +124,54 @@ class Space():
             # Consider all hospitals to move
             for hospital in self.hospitals:
 
-                # Consider all neighbors for that hospital
-                for replacement in self.get_neighbors(*hospital):
-
-                    # Generate a neighboring set of hospitals
-                    neighbor = self.hospitals.copy()
-                    neighbor.remove(hospital)
-                    neighbor.add(replacement)
+                # Score every neighbor for that hospital from the
+                # nearest-hospital table, without building the neighbor set
+                replacements = self.get_neighbors(*hospital)
+                costs = self.move_costs(hospital, replacements)
+                self.trace.evaluated(len(costs))
+                for replacement, cost in zip(replacements, costs):
 
                     # Check if neighbor is best so far
-                    cost = self.get_cost(neighbor)
                     if best_neighbor_cost is None or cost < best_neighbor_cost:
                         best_neighbor_cost = cost
-                        best_neighbors = [neighbor]
+                        best_neighbors = [(hospital, replacement)]
                     elif best_neighbor_cost == cost:
-                        best_neighbors.append(neighbor)
+                        best_neighbors.append((hospital, replacement))
 
             # None of the neighbors are better than the current state
-            if best_neighbor_cost >= self.get_cost(self.hospitals):
+            if best_neighbor_cost is None or best_neighbor_cost >= self.cost:
+                if animation:
+                    self.get_renderer().save_animation(animation)
                 return self.hospitals
 
             # Move to a highest-valued neighbor
             else:
                 if log:
                     print(f"Found better neighbor: cost {best_neighbor_cost}")
-                self.hospitals = random.choice(best_neighbors)
+                self.move_hospital(*random.choice(best_neighbors))
+                self.trace.improved(self.cost)
 
             # Generate image
-            if image_prefix:
-                self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
+            self.output_frame(count, image_prefix, animation)
+
+        if animation:
+            self.get_renderer().save_animation(animation)
+
+    def random_restart(self, maximum, image_prefix=None, log=False,
+                       workers=None, seed=None, target_cost=None,
+                       animation=None):
+        """Repeats hill-climbing multiple times.
+
+        With workers, the restarts run in a pool of that many processes,
+        restart i seeded with the i-th seed drawn from seed. Once a state
+        costs target_cost or less, the remaining restarts are cancelled.
+        """
+        if workers is not None:
+            return self.parallel_restart(
+                maximum, workers, seed, target_cost, image_prefix, log,
+                animation
+            )
 
-    def random_restart(self, maximum, image_prefix=None, log=False):
-        """Repeats hill-climbing multiple times."""
         best_hospitals = None
         best_cost = None
 
@@ -102,20 +188,482 @@ class Space():
                 if log:
                     print(f"{i}: Found state: cost {cost}")
 
-            if image_prefix:
-                self.output_image(f"{image_prefix}{str(i).zfill(3)}.png")
+            self.output_frame(i, image_prefix, animation)
 
+            if target_cost is not None and best_cost <= target_cost:
+                break
+
+        if animation:
+            self.get_renderer().save_animation(animation)
         return best_hospitals
 
+    def parallel_restart(self, maximum, workers, seed=None, target_cost=None,
+                         image_prefix=None, log=False, animation=None):
+        """Runs the random_restart climbs in a pool of processes.
+
+        The space is sent to each worker once; the restarts only send
+        their seeds.
+        """
+        seeds = random.Random(seed).sample(range(2 ** 32), maximum)
+        best = None
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_restart_worker,
+                                 initargs=(self,)) as executor:
+            pending = {
+                executor.submit(seeded_hill_climb, restart_seed): i
+                for i, restart_seed in enumerate(seeds)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    hospitals, cost = future.result()
+
+                    # Ties go to the earliest restart, whatever order they finish in
+                    if best is None or (cost, i) < best[:2]:
+                        best = (cost, i, hospitals)
+                        if log:
+                            print(f"{i}: Found new best state: cost {cost}")
+                    elif log:
+                        print(f"{i}: Found state: cost {cost}")
+
+                    if image_prefix or animation:
+                        self.set_hospitals(hospitals)
+                        self.output_frame(i, image_prefix, animation)
+
+                # Stop early once the target is reached
+                if target_cost is not None and best[0] <= target_cost:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+
+        if animation:
+            self.get_renderer().save_animation(animation)
+        if best is None:
+            return None
+        self.set_hospitals(best[2])
+        return self.hospitals
+
+    def simulated_annealing(self, maximum=10000, temperature=None,
+                            cooling="exponential", alpha=0.999, log=False):
+        """Performs simulated annealing to find a solution.
+
+        Each step tries one random move: improvements are always taken,
+        worse moves with probability exp(-increase / temperature).
+        cooling is "exponential" (temperature * alpha ** step), "linear",
+        "logarithmic" or a function (temperature, step, maximum) -> temperature.
+        The temperature defaults to the mean house-hospital distance.
+        """
+        schedules = {
+            "exponential": lambda t, step, maximum: t * alpha ** step,
+            "linear": lambda t, step, maximum: t * (1 - step / maximum),
+            "logarithmic": lambda t, step, maximum: t / math.log(step + 2),
+        }
+        schedule = schedules[cooling] if isinstance(cooling, str) else cooling
+
+        self.place_random_hospitals()
+        self.trace = SearchTrace("simulated_annealing", self.cost)
+        if temperature is None:
+            temperature = max(1, self.cost / max(1, len(self.houses)))
+        best_hospitals, best_cost = self.hospitals, self.cost
+        if log:
+            print("Initial state: cost", self.cost)
+
+        for step in range(maximum):
+            current_temperature = schedule(temperature, step, maximum)
+            move = self.random_move()
+            if move is None:
+                break
+            cost = self.move_costs(*move)[0]
+            self.trace.evaluated()
+
+            increase = cost - self.cost
+            if increase <= 0 or (
+                current_temperature > 0
+                and random.random() < math.exp(-increase / current_temperature)
+            ):
+                self.move_hospital(*move)
+                if cost < best_cost:
+                    best_hospitals, best_cost = self.hospitals, cost
+                    self.trace.improved(cost)
+                    if log:
+                        print(f"{step}: Found better state: cost {cost}")
+
+        self.set_hospitals(best_hospitals)
+        return self.hospitals
+
+    def first_improvement(self, maximum=None, log=False):
+        """Performs stochastic first-improvement hill-climbing.
+
+        The moves are tried in random order and the first one that lowers
+        the cost is taken, until no move improves the current state.
+        """
+        count = 0
+        self.place_random_hospitals()
+        self.trace = SearchTrace("first_improvement", self.cost)
+        if log:
+            print("Initial state: cost", self.cost)
+
+        while maximum is None or count < maximum:
+            count += 1
+            moves = [
+                (hospital, replacement)
+                for hospital in self.hospitals
+                for replacement in self.get_neighbors(*hospital)
+            ]
+            random.shuffle(moves)
+
+            for move in moves:
+                cost = self.move_costs(*move)[0]
+                self.trace.evaluated()
+                if cost < self.cost:
+                    self.move_hospital(*move)
+                    self.trace.improved(cost)
+                    if log:
+                        print(f"Found better neighbor: cost {cost}")
+                    break
+
+            # None of the neighbors are better than the current state
+            else:
+                break
+
+        return self.hospitals
+
+    def tabu_search(self, maximum=1000, tenure=None, patience=100, log=False):
+        """Performs tabu search to find a solution.
+
+        Every step takes the best neighbor, even if it is worse, except
+        that cells vacated in the last tenure steps may not be reoccupied
+        (unless that beats the best state). Stops after maximum steps or
+        patience steps without a new best state.
+        """
+        if tenure is None:
+            tenure = 2 * self.num_hospitals + 3
+
+        self.place_random_hospitals()
+        self.trace = SearchTrace("tabu_search", self.cost)
+        best_hospitals, best_cost = self.hospitals, self.cost
+        tabu = deque(maxlen=tenure)
+        since_best = 0
+        if log:
+            print("Initial state: cost", self.cost)
+
+        for step in range(maximum):
+            best_neighbors = []
+            best_neighbor_cost = None
+            for hospital in self.hospitals:
+                replacements = self.get_neighbors(*hospital)
+                costs = self.move_costs(hospital, replacements)
+                self.trace.evaluated(len(costs))
+                for replacement, cost in zip(replacements, costs):
+                    if replacement in tabu and cost >= best_cost:
+                        continue
+                    if best_neighbor_cost is None or cost < best_neighbor_cost:
+                        best_neighbor_cost = cost
+                        best_neighbors = [(hospital, replacement)]
+                    elif best_neighbor_cost == cost:
+                        best_neighbors.append((hospital, replacement))
+
+            # Every move is tabu
+            if best_neighbor_cost is None:
+                break
+
+            hospital, replacement = random.choice(best_neighbors)
+            self.move_hospital(hospital, replacement)
+            tabu.append(hospital)
+
+            if self.cost < best_cost:
+                best_hospitals, best_cost = self.hospitals, self.cost
+                self.trace.improved(best_cost)
+                since_best = 0
+                if log:
+                    print(f"{step}: Found better state: cost {best_cost}")
+            else:
+                since_best += 1
+                if since_best >= patience:
+                    break
+
+        self.set_hospitals(best_hospitals)
+        return self.hospitals
+
+    def place_random_hospitals(self):
+        """Places the hospitals on random available cells."""
+        for hospital in self.columns:
+            self.release(hospital)
+        self.columns = {}
+
+        hospitals = set()
+        for i in range(self.num_hospitals):
+            hospital = self.random_free_cell()
+            self.occupy(hospital)
+            hospitals.add(hospital)
+        self.set_hospitals(hospitals)
+
+    def random_move(self):
+        """Returns a random (hospital, replacement) move, or None if stuck."""
+        hospitals = list(self.hospitals)
+        random.shuffle(hospitals)
+        for hospital in hospitals:
+            replacements = self.get_neighbors(*hospital)
+            if replacements:
+                return hospital, random.choice(replacements)
+        return None
+
+    def candidate_sites(self):
+        """Returns the free cells that can hold an optimal hospital.
+
+        Between two consecutive house rows the cost of a hospital changes
+        linearly with its row, so it can slide onto a house row without
+        getting worse, or stop next to the house blocking that cell; the
+        same holds for columns. A hospital off the house rows slides onto
+        a house column in its row, which holds no house, and then onto a
+        house row, so only the free cells on both a house row and a house
+        column and those next to a house are kept.
+        """
+        rows = sorted(set(row for row, col in self.houses))
+        cols = sorted(set(col for row, col in self.houses))
+        cells = set((row, col) for row in rows for col in cols)
+        for row, col in self.houses:
+            cells.update(
+                (r, c)
+                for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                if 0 <= r < self.height and 0 <= c < self.width
+            )
+        return sorted(cells - self.houses)
+
+    def lower_bound(self, candidates=None, hospitals=None, iterations=600,
+                    time_limit=None, log=False):
+        """Lagrangian lower bound on the cost of any placement.
+
+        Relaxing "every house is served once" with multipliers lam gives
+        sum(lam) plus the num_hospitals smallest site values
+        sum(min(0, distance - lam)), a bound for any lam; lam is improved
+        by subgradient steps towards the cost of the best placement known
+        (hospitals, if given, and the sites opened along the way).
+        Stops after iterations steps or time_limit seconds. Returns
+        (bound, hospitals, cost) with the best bound and the cheapest
+        placement found. The site values are summed a block of candidates
+        at a time, so only the float32 distances have houses * sites
+        entries. Without houses every placement costs 0, so the bound is
+        0 and hospitals is returned as the placement.
+        """
+        if not self.houses:
+            return 0.0, hospitals, 0
+
+        start = time.perf_counter()
+        if candidates is None:
+            candidates = self.candidate_sites()
+        distances = self.get_distances(candidates, dtype=np.float32)
+        p = min(self.num_hospitals, len(candidates))
+        block_size = max(1, (1 << 22) // len(self.houses))
+        values = np.empty(len(candidates))
+
+        best_hospitals, best_cost = None, None
+        if hospitals:
+            best_hospitals, best_cost = hospitals, self.get_cost(hospitals)
+        multipliers = distances.min(axis=1).astype(np.float64)
+        best_bound = 0.0
+        scale = 2.0
+        stalled = 0
+
+        for iteration in range(iterations):
+            for block in range(0, len(candidates), block_size):
+                reduced = distances[:, block:block + block_size] - multipliers[:, None]
+                values[block:block + block_size] = np.minimum(reduced, 0, out=reduced).sum(axis=0)
+            opened = np.argpartition(values, p - 1)[:p]
+            bound = float(multipliers.sum() + values[opened].sum())
+
+            # The opened sites are a feasible placement
+            cost = int(distances[:, opened].min(axis=1).sum())
+            if best_cost is None or cost < best_cost:
+                best_hospitals = set(candidates[j] for j in opened)
+                best_cost = cost
+
+            if bound > best_bound + 1e-6:
+                best_bound = bound
+                stalled = 0
+                if log:
+                    print(f"{iteration}: lower bound {bound:.2f}, cost {best_cost}")
+            else:
+                stalled += 1
+                if stalled >= 20:
+                    scale /= 2
+                    stalled = 0
+
+            # Stop when the bound proves the best placement optimal
+            if math.ceil(best_bound - 1e-3) >= best_cost or scale < 1e-4:
+                break
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+
+            # Subgradient: 1 - number of opened sites serving each house
+            gradient = 1 - (distances[:, opened] < multipliers[:, None]).sum(axis=1)
+            norm = (gradient ** 2).sum()
+            if norm == 0:
+                break
+            multipliers = multipliers + scale * (best_cost - bound) / norm * gradient
+
+        return best_bound, best_hospitals, best_cost
+
+    def solve_p_median(self, candidates=None, time_limit=None,
+                       max_variables=100000, incumbent=None, log=False):
+        """Places the hospitals by solving the p-median problem.
+
+        Minimizes the summed distances with a MILP over the candidate
+        sites (open[site] binary, assign[house, site] continuous) using
+        scipy.optimize.milp. The MILP has sites * (houses + 1) variables;
+        HiGHS takes up to about ten seconds on 100,000 of them but can run
+        for minutes on millions, so larger instances (over max_variables)
+        skip it. Those, and solves cut short by time_limit (seconds for
+        the whole call), report the best lower bound instead of a proven
+        optimum, with the best placement known: the incumbent, the
+        Lagrangian one from lower_bound or the MILP's.
+
+        incumbent is a placement to beat; it defaults to the current
+        placement, if complete, or else the result of a quick
+        simulated_annealing run, so the result is never worse than it.
+        Returns a dict with the hospitals, their cost, a lower bound and
+        whether the cost is optimal.
+        """
+        from scipy import optimize, sparse
+
+        start = time.perf_counter()
+        if candidates is None:
+            candidates = self.candidate_sites()
+
+        if incumbent is None:
+            if len(self.hospitals) == self.num_hospitals:
+                incumbent = self.hospitals
+            else:
+                incumbent = self.simulated_annealing()
+
+        def remaining():
+            if time_limit is None:
+                return None
+            return max(0.0, time_limit - (time.perf_counter() - start))
+
+        bound, hospitals, cost = self.lower_bound(
+            candidates, incumbent, time_limit=remaining(), log=log
+        )
+        houses, sites = len(self.houses), len(candidates)
+        p = self.num_hospitals
+
+        if (math.ceil(bound - 1e-6) < cost
+                and sites + houses * sites <= max_variables
+                and remaining() != 0):
+            distances = self.get_distances(candidates)
+
+            # Each house is assigned once, only to an open site, and p sites open
+            assign = sparse.hstack([
+                sparse.csr_array((houses, sites)),
+                sparse.kron(sparse.eye_array(houses), np.ones((1, sites)))
+            ], format="csr")
+            link = sparse.hstack([
+                -sparse.kron(np.ones((houses, 1)), sparse.eye_array(sites)),
+                sparse.eye_array(houses * sites)
+            ], format="csr")
+            count = sparse.hstack([
+                np.ones((1, sites)), sparse.csr_array((1, houses * sites))
+            ], format="csr")
+
+            options = {"disp": log}
+            if time_limit is not None:
+                options["time_limit"] = remaining()
+            result = optimize.milp(
+                np.concatenate([np.zeros(sites), distances.ravel()]),
+                constraints=[
+                    optimize.LinearConstraint(assign, 1, 1),
+                    optimize.LinearConstraint(link, -np.inf, 0),
+                    optimize.LinearConstraint(count, p, p),
+                ],
+                integrality=np.concatenate([np.ones(sites), np.zeros(houses * sites)]),
+                bounds=optimize.Bounds(0, 1),
+                options=options,
+            )
+
+            if result.x is not None and round(result.fun) <= cost:
+                opened = np.flatnonzero(result.x[:sites] > 0.5)
+                hospitals = set(candidates[j] for j in opened)
+                cost = self.get_cost(hospitals)
+            if result.status == 0:
+                bound = max(bound, result.fun)
+            elif getattr(result, "mip_dual_bound", None) is not None:
+                bound = max(bound, result.mip_dual_bound)
+
+        self.set_hospitals(hospitals)
+        return {
+            "hospitals": hospitals,
+            "cost": cost,
+            "lower_bound": math.ceil(bound - 1e-6),
+            "optimal": math.ceil(bound - 1e-6) >= cost,
+            "candidates": sites,
+        }
+
     def get_cost(self, hospitals):
         """Calculates sum of distances from houses to nearest hospital."""
-        cost = 0
-        for house in self.houses:
-            cost += min(
-                abs(house[0] - hospital[0]) + abs(house[1] - hospital[1])
-                for hospital in hospitals
-            )
-        return cost
+        if not self.houses:
+            return 0
+        return int(self.get_distances(hospitals).min(axis=1).sum())
+
+    def get_distances(self, cells, dtype=np.int64):
+        """Returns the distances from every house (rows) to every cell (columns)."""
+        if self.house_array is None:
+            self.house_array = np.array(list(self.houses), dtype=np.int64).reshape(-1, 2)
+        houses = self.house_array.astype(dtype)
+        cells = np.array(list(cells), dtype=np.int64).reshape(-1, 2).astype(dtype)
+        distances = np.abs(houses[:, 0, None] - cells[:, 0])
+        distances += np.abs(houses[:, 1, None] - cells[:, 1])
+        return distances
+
+    def set_hospitals(self, hospitals):
+        """Places the hospitals and rebuilds the nearest-hospital table."""
+        for hospital in self.columns:
+            if hospital not in hospitals:
+                self.release(hospital)
+        for hospital in hospitals:
+            self.occupy(hospital)
+
+        self.hospitals = hospitals
+        self.columns = {hospital: i for i, hospital in enumerate(hospitals)}
+        self.distance_table = self.get_distances(self.columns)
+        self.update_nearest()
+
+    def update_nearest(self):
+        """Finds each house's nearest and second-nearest hospital."""
+        table = self.distance_table
+        rows = np.arange(len(table))
+        self.nearest = table.argmin(axis=1)
+        self.nearest_distance = table[rows, self.nearest]
+        if table.shape[1] > 1:
+            self.second_distance = np.partition(table, 1, axis=1)[:, 1]
+        else:
+            self.second_distance = np.full(len(table), np.iinfo(np.int64).max)
+        self.cost = int(self.nearest_distance.sum())
+
+    def move_costs(self, hospital, replacements):
+        """Returns the cost after moving a hospital to each replacement."""
+        if not replacements:
+            return []
+
+        # Houses served by the moved hospital fall back to their second-nearest one
+        served = self.nearest == self.columns[hospital]
+        remaining = np.where(served, self.second_distance, self.nearest_distance)
+        distances = np.minimum(self.get_distances(replacements), remaining[:, None])
+        return [int(cost) for cost in distances.sum(axis=0)]
+
+    def move_hospital(self, hospital, replacement):
+        """Moves a hospital and updates the nearest-hospital table."""
+        hospitals = self.hospitals.copy()
+        hospitals.remove(hospital)
+        hospitals.add(replacement)
+        self.hospitals = hospitals
+        self.release(hospital)
+        self.occupy(replacement)
+
+        column = self.columns.pop(hospital)
+        self.columns[replacement] = column
+        self.distance_table[:, column] = self.get_distances([replacement])[:, 0]
+        self.update_nearest()
 
     def get_neighbors(self, row, col):
         """Returns neighbors not already containing a house or hospital."""
@@ -127,38 +675,80 @@ class Space():
         ]
         neighbors = []
         for r, c in candidates:
-            if (r, c) in self.houses or (r, c) in self.hospitals:
-                continue
             if 0 <= r < self.height and 0 <= c < self.width:
-                neighbors.append((r, c))
+                if not self.occupied_view[r * self.width + c]:
+                    neighbors.append((r, c))
         return neighbors
 
     def output_image(self, filename):
         """Generates image with all houses and hospitals."""
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        cost_size = 40
-        padding = 10
+        self.get_renderer().render().save(filename)
+
+    def output_frame(self, count, image_prefix=None, animation=None):
+        """Saves the current state as a numbered image and/or animation frame."""
+        if image_prefix:
+            self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
+        if animation:
+            self.get_renderer().record()
+
+    def get_renderer(self):
+        """Returns the space's renderer, creating it on first use."""
+        if self.renderer is None:
+            self.renderer = Renderer(self)
+        return self.renderer
+
+
+class Renderer():
+    """Draws a Space, reusing the assets, the empty grid and the last frame."""
+
+    def __init__(self, space, cell_size=100):
+        from PIL import Image, ImageFont
+        self.space = space
+        self.cell_size = cell_size
+        self.cell_border = 2
+        self.cost_size = 40
+        self.padding = 10
+
+        self.house = Image.open("assets/images/House.png").resize(
+            (cell_size, cell_size)
+        )
+        self.hospital = Image.open("assets/images/Hospital.png").resize(
+            (cell_size, cell_size)
+        )
+        self.font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 30)
+
+        # Houses drawn on the background, hospitals drawn on the frame
+        self.houses = None
+        self.drawn = set()
+        self.background = None
+        self.frame = None
+
+        # (hospitals, cost) states recorded for an animation
+        self.states = []
+
+    def cell_origin(self, cell):
+        """Returns the top-left pixel inside a cell's border."""
+        i, j = cell
+        return (j * self.cell_size + self.cell_border,
+                i * self.cell_size + self.cell_border)
+
+    def draw_background(self):
+        """Draws the grid and the houses, which do not move during a search."""
+        from PIL import Image, ImageDraw
+        space = self.space
+        cell_size = self.cell_size
+        cell_border = self.cell_border
 
         # Create a blank canvas
         img = Image.new(
             "RGBA",
-            (self.width * cell_size,
-             self.height * cell_size + cost_size + padding * 2),
+            (space.width * cell_size,
+             space.height * cell_size + self.cost_size + self.padding * 2),
             "white"
         )
-        house = Image.open("assets/images/House.png").resize(
-            (cell_size, cell_size)
-        )
-        hospital = Image.open("assets/images/Hospital.png").resize(
-            (cell_size, cell_size)
-        )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 30)
         draw = ImageDraw.Draw(img)
-
-        for i in range(self.height):
-            for j in range(self.width):
+        for i in range(space.height):
+            for j in range(space.width):
 
                 # Draw cell
                 rect = [
@@ -169,31 +759,139 @@ class Space():
                 ]
                 draw.rectangle(rect, fill="black")
 
-                if (i, j) in self.houses:
-                    img.paste(house, rect[0], house)
-                if (i, j) in self.hospitals:
-                    img.paste(hospital, rect[0], hospital)
+        for house in space.houses:
+            img.paste(self.house, self.cell_origin(house), self.house)
+
+        self.houses = set(space.houses)
+        self.background = img
+        self.frame = img.copy()
+        self.drawn = set()
+
+    def render(self, hospitals=None, cost=None):
+        """Updates the frame to the given (default: current) hospitals."""
+        from PIL import ImageDraw
+        space = self.space
+        if hospitals is None:
+            hospitals = space.hospitals
+        if cost is None:
+            cost = space.get_cost(hospitals)
+        if self.houses != space.houses:
+            self.draw_background()
+
+        # Repaint only the cells a hospital left or entered
+        for cell in self.drawn - hospitals:
+            left, top = self.cell_origin(cell)
+            box = (left, top, left + self.cell_size, top + self.cell_size)
+            self.frame.paste(self.background.crop(box), box[:2])
+        for cell in hospitals - self.drawn:
+            self.frame.paste(self.hospital, self.cell_origin(cell), self.hospital)
+        self.drawn = set(hospitals)
 
         # Add cost
+        width = space.width * self.cell_size
+        top = space.height * self.cell_size
+        draw = ImageDraw.Draw(self.frame)
         draw.rectangle(
-            (0, self.height * cell_size, self.width * cell_size,
-             self.height * cell_size + cost_size + padding * 2),
+            (0, top, width, top + self.cost_size + self.padding * 2),
             "black"
         )
         draw.text(
-            (padding, self.height * cell_size + padding),
-            f"Cost: {self.get_cost(self.hospitals)}",
+            (self.padding, top + self.padding),
+            f"Cost: {cost}",
             fill="white",
-            font=font
+            font=self.font
         )
+        return self.frame
+
+    def record(self):
+        """Records the current state as an animation frame."""
+        hospitals = frozenset(self.space.hospitals)
+        self.states.append((hospitals, self.space.get_cost(hospitals)))
+
+    def save_animation(self, filename, duration=500):
+        """Saves the recorded states as an animated GIF (.gif) or PNG (.png).
+
+        The frames are rendered one at a time while the file is written.
+        """
+        if not self.states:
+            return
+        first, *rest = self.states
+        self.states = []
+        self.render(*first).copy().save(
+            filename, save_all=True, append_images=RenderedFrames(self, rest),
+            duration=duration, loop=0
+        )
+
+
+class RenderedFrames():
+    """Renders recorded states on iteration (APNG iterates them twice)."""
+
+    def __init__(self, renderer, states):
+        self.renderer = renderer
+        self.states = states
+
+    def __iter__(self):
+        for state in self.states:
+            yield self.renderer.render(*state)
+
+
+class SearchTrace():
+    """Counts the cost evaluations of a search and its best cost over time."""
+
+    def __init__(self, engine, cost):
+        self.engine = engine
+        self.evaluations = 0
+        self.start = self.last = time.perf_counter()
+        self.best_cost = cost
+        self.history = [(0, 0.0, cost)]
+
+    def evaluated(self, count=1):
+        self.evaluations += count
+        self.last = time.perf_counter()
+
+    def improved(self, cost):
+        """Records a new best cost with the evaluations and time it took."""
+        if cost < self.best_cost:
+            self.best_cost = cost
+            self.history.append((self.evaluations, self.seconds, cost))
+
+    @property
+    def seconds(self):
+        return self.last - self.start
+
+    @property
+    def evaluations_per_second(self):
+        return self.evaluations / max(self.seconds, 1e-9)
+
+
+# Space of the restarts, sent once to each worker process
+RESTART_SPACE = None
+
+
+def init_restart_worker(space):
+    """Keeps the space of the restarts in a worker process."""
+    global RESTART_SPACE
+    RESTART_SPACE = space
+
+
+def seeded_hill_climb(seed):
+    """Runs one hill climb with its own seed (in a worker process).
+
+    The climb runs on a copy of the worker's space, so every restart
+    starts from the same state whichever restarts ran before it.
+    """
+    space = copy.deepcopy(RESTART_SPACE)
+    random.seed(seed)
+    hospitals = space.hill_climb()
+    return hospitals, space.cost
 
-        img.save(filename)
 
+if __name__ == "__main__":
 
-# Create a new space and add houses randomly
-s = Space(height=10, width=20, num_hospitals=3)
-for i in range(15):
-    s.add_house(random.randrange(s.height), random.randrange(s.width))
+    # Create a new space and add houses randomly
+    s = Space(height=10, width=20, num_hospitals=3)
+    for i in range(15):
+        s.add_house(random.randrange(s.height), random.randrange(s.width))
 
-# Use local search to determine hospital placement
-hospitals = s.hill_climb(image_prefix="hospitals", log=True)
+    # Use local search to determine hospital placement
+    hospitals = s.hill_climb(image_prefix="hospitals", log=True)
@@ -1,17 +1,290 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
 import scipy.optimize
+import scipy.sparse
+import scipy.sparse.linalg
 
 # Objective Function: 50x_1 + 80x_2
 # Constraint 1: 5x_1 + 2x_2 <= 20
 # Constraint 2: -10x_1 + -12x_2 <= -90
+COSTS = [50, 80]  # Cost function: 50x_1 + 80x_2
+A_UB = [[5, 2], [-10, -12]]  # Coefficients for inequalities
+B_UB = [20, -90]  # Constraints for inequalities: 20 and -90
+
+# Tolerance of the warm-start feasibility and optimality checks
+TOLERANCE = 1e-9
+
+
+class ScenarioSolver():
+    """Solves min costs @ x subject to A_ub @ x <= b_ub, x >= 0 for many
+    (costs, b_ub) scenarios sharing one constraint matrix."""
+
+    def __init__(self, A_ub=A_UB):
+        self.A_ub = scipy.sparse.csr_array(A_ub, dtype=float)
+        m, n = self.A_ub.shape
+
+        # Columns of the variables and of the constraint slacks
+        self.columns = scipy.sparse.hstack(
+            [self.A_ub, scipy.sparse.eye_array(m)], format="csc"
+        )
+
+        # Last optimal basis: basic columns and the LU factors of their matrix
+        self.basic = None
+        self.factors = None
+
+    def solve(self, costs, b_ub):
+        """Solves one scenario.
+
+        Tries the previous optimal basis first: if it is still feasible
+        and optimal for the new costs and limits, the solution follows
+        from two solves with its LU factors and HiGHS is not called.
+        Returns (x, objective, status, warm_start) with linprog's status
+        codes (0 optimal, 2 infeasible, 3 unbounded, ...).
+        """
+        costs = np.asarray(costs, dtype=float)
+        b_ub = np.asarray(b_ub, dtype=float)
+
+        if self.factors is not None:
+            x = self.solve_from_basis(costs, b_ub)
+            if x is not None:
+                return x, float(costs @ x), 0, True
+
+        result = scipy.optimize.linprog(
+            costs, A_ub=self.A_ub, b_ub=b_ub, method="highs"
+        )
+        if result.status == 0:
+            self.set_basis(result.x, result.slack)
+        return result.x, result.fun, result.status, False
+
+    def set_basis(self, x, slack):
+        """Keeps the basis of an optimal solution, if it is not degenerate."""
+        m, n = self.A_ub.shape
+        basic = np.concatenate([
+            np.flatnonzero(x > TOLERANCE),
+            n + np.flatnonzero(slack > TOLERANCE)
+        ])
+        self.basic = self.factors = None
+        if len(basic) != m:
+            return
+        try:
+            self.factors = scipy.sparse.linalg.splu(self.columns[:, basic])
+        except RuntimeError:  # Singular basis matrix
+            return
+        self.basic = basic
+
+    def solve_from_basis(self, costs, b_ub):
+        """Returns the optimal x from the kept basis, or None if the basis
+        is not feasible or not optimal for this scenario."""
+        m, n = self.A_ub.shape
+
+        # Primal feasibility: basic values B^-1 b_ub >= 0
+        values = self.factors.solve(b_ub)
+        if values.min() < -TOLERANCE:
+            return None
+
+        # Optimality: reduced costs c - [A I]^T y >= 0 with B^T y = c_B
+        full_costs = np.concatenate([costs, np.zeros(m)])
+        duals = self.factors.solve(full_costs[self.basic], trans="T")
+        reduced = full_costs - self.columns.T @ duals
+        if reduced.min() < -TOLERANCE:
+            return None
+
+        solution = np.zeros(n + m)
+        solution[self.basic] = np.maximum(values, 0)
+        return solution[:n]
+
+
+def solve_chunk(A_ub, chunk):
+    """Solves a chunk of scenarios in order (in a worker process)."""
+    first, costs, b_ubs = chunk
+    solver = ScenarioSolver(A_ub)
+    rows = []
+    for i, (scenario_costs, scenario_b_ub) in enumerate(zip(costs, b_ubs)):
+        start = time.perf_counter()
+        x, objective, status, warm_start = solver.solve(scenario_costs, scenario_b_ub)
+        rows.append((first + i, status, objective, x, warm_start,
+                     time.perf_counter() - start))
+    return rows
+
+
+def solve_scenarios(costs=COSTS, b_ub=B_UB, A_ub=A_UB, workers=None,
+                    chunk_size=500):
+    """Solves the production LP for many cost and limit scenarios.
+
+    costs is one cost vector or a (scenarios x variables) array, and b_ub
+    one limit vector or a (scenarios x constraints) array; a single vector
+    is used for every scenario. The constraint matrix is built once as a
+    sparse matrix. Chunks of chunk_size consecutive scenarios are solved
+    in order (so similar neighbors can reuse the last optimal basis),
+    in a pool of workers processes if workers is given.
+
+    Returns a DataFrame with one row per scenario: scenario, status,
+    objective, x_1 ... x_n, warm_start and seconds.
+    """
+    A_ub = scipy.sparse.csr_array(A_ub, dtype=float)
+    costs = np.atleast_2d(np.asarray(costs, dtype=float))
+    b_ub = np.atleast_2d(np.asarray(b_ub, dtype=float))
+    scenarios = max(len(costs), len(b_ub))
+    costs = np.broadcast_to(costs, (scenarios, costs.shape[1]))
+    b_ub = np.broadcast_to(b_ub, (scenarios, b_ub.shape[1]))
+
+    chunks = [
+        (start, costs[start:start + chunk_size], b_ub[start:start + chunk_size])
+        for start in range(0, scenarios, chunk_size)
+    ]
+    if workers is None:
+        results = map(partial(solve_chunk, A_ub), chunks)
+        rows = [row for chunk_rows in results for row in chunk_rows]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(partial(solve_chunk, A_ub), chunks)
+            rows = [row for chunk_rows in results for row in chunk_rows]
+
+    n = A_ub.shape[1]
+    x = np.array([
+        row[3] if row[3] is not None else np.full(n, np.nan) for row in rows
+    ]).reshape(len(rows), n)
+    table = pd.DataFrame({
+        "scenario": [row[0] for row in rows],
+        "status": [row[1] for row in rows],
+        "objective": [row[2] for row in rows],
+    })
+    for j in range(n):
+        table[f"x_{j + 1}"] = x[:, j]
+    table["warm_start"] = [row[4] for row in rows]
+    table["seconds"] = [row[5] for row in rows]
+    return table
+
+
+def sensitivity_report(costs=COSTS, b_ub=B_UB, A_ub=A_UB):
+    """Solves the production LP and reports its sensitivity analysis.
+
+    Returns (result, constraints, variables): the linprog result and two
+    DataFrames. constraints has each limit's slack, shadow price (change
+    of the objective per unit of b_ub, the HiGHS marginal) and the range
+    of b_ub over which that price holds; variables has each variable's
+    value, reduced cost (the HiGHS marginal of its lower bound) and the
+    range of its cost over which the solution stays optimal. Within those
+    ranges, what-if questions need no new solve: moving limit i to b
+    changes the objective by shadow_price * (b - b_ub[i]).
+    The ranges come from an optimal basis; they are NaN if none is found.
+    """
+    solver = ScenarioSolver(A_ub)
+    costs = np.asarray(costs, dtype=float)
+    b_ub = np.asarray(b_ub, dtype=float)
+    m, n = solver.A_ub.shape
+
+    result = scipy.optimize.linprog(
+        costs, A_ub=solver.A_ub, b_ub=b_ub, method="highs"
+    )
+    if result.status != 0:
+        return result, None, None
+
+    duals = result.ineqlin.marginals
+    full_costs = np.concatenate([costs, np.zeros(m)])
+    reduced = full_costs - solver.columns.T @ duals
+    solution = np.concatenate([result.x, result.slack])
+
+    rhs_range = np.full((m, 2), np.nan)
+    cost_range = np.full((n, 2), np.nan)
+    basic = optimal_basis(solver.columns, solution, reduced)
+    if basic is not None:
+
+        # Tableau B^-1 [A I]; its slack columns are B^-1 itself
+        tableau = scipy.sparse.linalg.splu(solver.columns[:, basic]).solve(
+            solver.columns.toarray()
+        )
+        values = solution[basic]
+
+        # b_ub[i] + delta keeps B^-1 b >= 0 while values + delta * column >= 0
+        for i in range(m):
+            column = tableau[:, n + i]
+            rhs_range[i] = b_ub[i] + step_range(values, column)
+
+        # A basic cost may move while the reduced costs stay >= 0
+        nonbasic = np.setdiff1d(np.arange(n + m), basic)
+        position = {var: k for k, var in enumerate(basic)}
+        for j in range(n):
+            if j in position:
+                row = tableau[position[j], nonbasic]
+                cost_range[j] = costs[j] + step_range(reduced[nonbasic], -row)
+            else:
+                cost_range[j] = [costs[j] - reduced[j], np.inf]
+
+    constraints = pd.DataFrame({
+        "constraint": np.arange(1, m + 1),
+        "b_ub": b_ub,
+        "slack": result.slack,
+        "shadow_price": duals,
+        "b_ub_lower": rhs_range[:, 0],
+        "b_ub_upper": rhs_range[:, 1],
+    })
+    variables = pd.DataFrame({
+        "variable": [f"x_{j + 1}" for j in range(n)],
+        "x": result.x,
+        "cost": costs,
+        "reduced_cost": result.lower.marginals,
+        "cost_lower": cost_range[:, 0],
+        "cost_upper": cost_range[:, 1],
+    })
+    return result, constraints, variables
+
+
+def optimal_basis(columns, solution, reduced):
+    """Picks m basic columns: the nonzero ones, completed with zero-valued
+    columns whose reduced cost is zero, keeping the basis nonsingular.
+    Returns their indices, or None."""
+    m = columns.shape[0]
+    dense = columns.toarray()
+    basic = list(np.flatnonzero(solution > TOLERANCE))
+    if np.linalg.matrix_rank(dense[:, basic]) < len(basic):
+        return None
+    for j in np.flatnonzero((solution <= TOLERANCE) & (np.abs(reduced) <= 1e-7)):
+        if len(basic) == m:
+            break
+        if np.linalg.matrix_rank(dense[:, basic + [j]]) == len(basic) + 1:
+            basic.append(j)
+    return np.array(basic) if len(basic) == m else None
+
+
+def step_range(values, direction):
+    """Returns the [lower, upper] steps t keeping values + t * direction >= 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = -values / direction
+    lower = ratios[direction > TOLERANCE]
+    upper = ratios[direction < -TOLERANCE]
+    return np.array([
+        lower.max() if len(lower) else -np.inf,
+        upper.min() if len(upper) else np.inf,
+    ])
+
+
+if __name__ == "__main__":
+    result = scipy.optimize.linprog(
+        COSTS,
+        A_ub=A_UB,
+        b_ub=B_UB,
+    )
+
+    if result.success:
+        print(f"X1: {round(result.x[0], 2)} hours")
+        print(f"X2: {round(result.x[1], 2)} hours")
+    else:
+        print("No solution")
+
+    # Re-solve for a range of machine X1 costs and labor limits
+    rng = np.random.default_rng(0)
+    scenarios = 2000
+    costs = np.column_stack([rng.uniform(30, 120, scenarios), np.full(scenarios, 80)])
+    limits = np.column_stack([rng.uniform(15, 25, scenarios), np.full(scenarios, -90)])
+    table = solve_scenarios(costs, limits, workers=2)
+    print(table.describe())
 
-result = scipy.optimize.linprog(
-    [50, 80],  # Cost function: 50x_1 + 80x_2
-    A_ub=[[5, 2], [-10, -12]],  # Coefficients for inequalities
-    b_ub=[20, -90],  # Constraints for inequalities: 20 and -90
-)
-
-if result.success:
-    print(f"X1: {round(result.x[0], 2)} hours")
-    print(f"X2: {round(result.x[1], 2)} hours")
-else:
-    print("No solution")
+    # Shadow prices and ranges of the original plan
+    result, constraints, variables = sensitivity_report()
+    print(constraints.to_string(index=False))
+    print(variables.to_string(index=False))
@@ -0,0 +1,259 @@
+"""
+Backtracking search with heuristics and inference for the scheduling
+problems: schedule0's search plus an adjacency index over the constraints,
+MRV/degree variable ordering, least-constraining-value ordering, AC-3
+and forward checking, assigning in place and undoing on backtrack.
+"""
+
+import random
+import time
+from collections import deque
+
+from schedule0 import CONSTRAINTS, VARIABLES
+
+DAYS = ["Monday", "Tuesday", "Wednesday"]
+
+
+class CSP():
+
+    def __init__(self, variables, domains, constraints):
+        """Create a problem where each constraint (x, y) means x != y.
+
+        domains is a list of values shared by every variable, or a dict
+        mapping each variable to its own list of values.
+        """
+        self.variables = list(variables)
+        if isinstance(domains, dict):
+            self.values = {var: list(domains[var]) for var in self.variables}
+        else:
+            self.values = {var: list(domains) for var in self.variables}
+
+        self.constraints = list(constraints)
+        self.position = {var: i for i, var in enumerate(self.variables)}
+
+        # Adjacency index: the variables each variable must differ from
+        self.neighbors = {var: set() for var in self.variables}
+        for x, y in constraints:
+            if x != y:
+                self.neighbors[x].add(y)
+                self.neighbors[y].add(x)
+
+        self.domains = None
+        self.assignment = None
+        self.stats = None
+
+    def reset(self):
+        """Restores the full domains and clears the assignment."""
+        self.domains = {var: set(values) for var, values in self.values.items()}
+        self.assignment = {}
+
+        # Unassigned variables, the position in variable order before which
+        # every variable is assigned, and their unassigned neighbors
+        self.unassigned = dict.fromkeys(self.variables)
+        self.first_unassigned = 0
+        self.degree = {var: len(self.neighbors[var]) for var in self.variables}
+        self.stats = {
+            "nodes": 0,
+            "backtracks": 0,
+            "ac3_removals": 0,
+            "fc_removals": 0,
+            "seconds": 0.0,
+            "limit_reached": False,
+        }
+
+    def solve(self, mrv=True, lcv=True, ac3=True, forward_checking=True,
+              rng=None, node_limit=None):
+        """Returns a solution (dict of variable -> value) or None.
+
+        rng (a random.Random) breaks ties between equally ranked
+        variables and values at random. The search gives up after
+        node_limit nodes, setting stats["limit_reached"].
+        The search counts are left in self.stats: nodes (values tried),
+        backtracks, values removed by AC-3 and by forward checking, and
+        the time taken.
+        """
+        self.reset()
+        self.mrv = mrv
+        self.lcv = lcv
+        self.forward_checking = forward_checking
+        self.rng = rng
+        self.node_limit = node_limit
+
+        start = time.perf_counter()
+        solution = None
+        if not ac3 or self.ac3():
+            solution = self.backtrack()
+        self.stats["seconds"] = time.perf_counter() - start
+        return solution
+
+    def ac3(self, arcs=None):
+        """Makes every arc consistent; returns False if a domain empties."""
+        if arcs is None:
+            arcs = [(x, y) for x in self.variables for y in self.neighbors[x]]
+        queue = deque(arcs)
+        while queue:
+            x, y = queue.popleft()
+            if self.revise(x, y):
+                if not self.domains[x]:
+                    return False
+                for z in self.neighbors[x]:
+                    if z != y:
+                        queue.append((z, x))
+        return True
+
+    def revise(self, x, y):
+        """Removes the values of x that leave y no different value."""
+        if len(self.domains[y]) != 1:
+            return False
+        value = next(iter(self.domains[y]))
+        if value not in self.domains[x]:
+            return False
+        self.domains[x].remove(value)
+        self.stats["ac3_removals"] += 1
+        return True
+
+    def backtrack(self):
+        """Runs backtracking search to find an assignment.
+
+        The search is iterative (a stack of variables with their remaining
+        values), so it is not limited by the recursion depth.
+        """
+        var = self.select_unassigned_variable()
+        if var is None:
+            return dict(self.assignment)
+        stack = [[var, iter(self.order_domain_values(var)), None]]
+
+        while stack:
+            frame = stack[-1]
+            var, values, removals = frame
+
+            # Undo the value that failed deeper in the search
+            if removals is not None:
+                self.unassign(var, removals)
+                frame[2] = None
+
+            # Try the next value that keeps the assignment consistent
+            for value in values:
+                if self.stats["nodes"] == self.node_limit:
+                    self.stats["limit_reached"] = True
+                    return None
+                self.stats["nodes"] += 1
+                removals = self.assign(var, value)
+                if removals is not None:
+                    break
+            else:
+                stack.pop()
+                self.stats["backtracks"] += 1
+                continue
+            frame[2] = removals
+
+            # Check if assignment is complete
+            var = self.select_unassigned_variable()
+            if var is None:
+                return dict(self.assignment)
+            stack.append([var, iter(self.order_domain_values(var)), None])
+
+        return None
+
+    def assign(self, var, value):
+        """Assigns a value in place.
+
+        Returns the (neighbor, value) domain removals made by forward
+        checking, or None (and no change) if the value is inconsistent.
+        """
+        removals = []
+        for neighbor in self.neighbors[var]:
+            if neighbor in self.assignment:
+                if self.assignment[neighbor] == value:
+                    self.restore(removals, value)
+                    return None
+            elif self.forward_checking and value in self.domains[neighbor]:
+                self.domains[neighbor].remove(value)
+                removals.append(neighbor)
+                if not self.domains[neighbor]:
+                    self.restore(removals, value)
+                    return None
+        self.assignment[var] = value
+        del self.unassigned[var]
+        for neighbor in self.neighbors[var]:
+            self.degree[neighbor] -= 1
+        self.stats["fc_removals"] += len(removals)
+        return removals
+
+    def unassign(self, var, removals):
+        """Undoes an assign."""
+        self.restore(removals, self.assignment.pop(var))
+        self.unassigned[var] = None
+        self.first_unassigned = min(self.first_unassigned, self.position[var])
+        for neighbor in self.neighbors[var]:
+            self.degree[neighbor] += 1
+
+    def restore(self, removals, value):
+        """Puts a value back into the domains it was removed from."""
+        for neighbor in removals:
+            self.domains[neighbor].add(value)
+
+    def select_unassigned_variable(self):
+        """Chooses the unassigned variable with the fewest values left
+        (MRV), then the most unassigned neighbors (degree)."""
+        if not self.unassigned:
+            return None
+        if not self.mrv:
+            # The first unassigned variable in variable order
+            while self.variables[self.first_unassigned] not in self.unassigned:
+                self.first_unassigned += 1
+            return self.variables[self.first_unassigned]
+        if self.rng is not None:
+            return min(
+                self.unassigned,
+                key=lambda var: (len(self.domains[var]), -self.degree[var],
+                                 self.rng.random())
+            )
+        return min(
+            self.unassigned,
+            key=lambda var: (len(self.domains[var]), -self.degree[var])
+        )
+
+    def order_domain_values(self, var):
+        """Orders the values of var, least constraining first (LCV)."""
+        values = [value for value in self.values[var]
+                  if value in self.domains[var]]
+        if self.rng is not None:
+            self.rng.shuffle(values)
+        if not self.lcv:
+            return values
+
+        def ruled_out(value):
+            return sum(1 for neighbor in self.neighbors[var]
+                       if neighbor in self.unassigned
+                       and value in self.domains[neighbor])
+        return sorted(values, key=ruled_out)
+
+
+def random_exam_problem(exams, slots, conflicts, seed=0):
+    """Generates a solvable exam timetable with the given number of
+    exams, time slots and conflicting exam pairs (exams sharing a
+    student), by hiding a timetable and only linking exams it keeps apart.
+    """
+    rng = random.Random(seed)
+    variables = [f"E{i}" for i in range(exams)]
+    hidden = {var: rng.randrange(slots) for var in variables}
+    constraints = set()
+    while len(constraints) < conflicts:
+        x, y = rng.sample(variables, 2)
+        if hidden[x] != hidden[y]:
+            constraints.add((min(x, y), max(x, y)))
+    return CSP(variables, list(range(slots)), sorted(constraints))
+
+
+if __name__ == "__main__":
+
+    # The schedule0 problem
+    problem = CSP(VARIABLES, DAYS, CONSTRAINTS)
+    print(problem.solve())
+    print(problem.stats)
+
+    # A larger random timetable
+    problem = random_exam_problem(exams=3000, slots=30, conflicts=30000)
+    solution = problem.solve()
+    print("Solved" if solution else "No solution", problem.stats)
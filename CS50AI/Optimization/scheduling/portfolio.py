@@ -0,0 +1,129 @@
+"""
+Portfolio solving for the scheduling problems: several search strategies
+run concurrently in a pool of processes, the first one to answer wins and
+the others are stopped.
+"""
+
+import random
+import time
+from multiprocessing import Pool, TimeoutError
+
+from constraint import (AllDifferentConstraint, BacktrackingSolver,
+                        MinConflictsSolver, Problem)
+
+from csp import random_exam_problem
+from schedule1 import clique_cover
+
+
+def solve_with_csp(problem, **options):
+    """Runs the csp.py search once with the given heuristics."""
+    solution = problem.solve(**options)
+    stats = dict(problem.stats)
+    return solution, not stats["limit_reached"], stats
+
+
+def solve_with_restarts(problem, seed=0, node_limit=100, growth=1.5,
+                        **options):
+    """Runs randomized csp.py searches, each allowed growth times more
+    nodes than the last, until one finishes."""
+    rng = random.Random(seed)
+    stats = {"restarts": 0, "nodes": 0, "backtracks": 0}
+    while True:
+        solution = problem.solve(rng=rng, node_limit=int(node_limit), **options)
+        stats["nodes"] += problem.stats["nodes"]
+        stats["backtracks"] += problem.stats["backtracks"]
+        if not problem.stats["limit_reached"]:
+            return solution, True, stats
+        stats["restarts"] += 1
+        node_limit *= growth
+
+
+def solve_with_constraint(problem, solver="backtracking", steps=100000,
+                          seed=0):
+    """Solves the problem with a python-constraint solver, using one
+    AllDifferentConstraint per clique of conflicting variables."""
+    random.seed(seed)
+    if solver == "min_conflicts":
+        model = Problem(MinConflictsSolver(steps=steps))
+    else:
+        model = Problem(BacktrackingSolver())
+    for var in problem.variables:
+        model.addVariable(var, problem.values[var])
+    for clique in clique_cover(problem.variables, problem.constraints):
+        model.addConstraint(AllDifferentConstraint(), clique)
+
+    solution = model.getSolution()
+
+    # Min-conflicts can miss solutions, so only backtracking proves there are none
+    return solution, solver != "min_conflicts", {}
+
+
+# (name, function, options) of the strategies tried by default
+STRATEGIES = [
+    ("mrv + lcv", solve_with_csp, {}),
+    ("mrv", solve_with_csp, {"lcv": False}),
+    ("fixed order", solve_with_csp, {"mrv": False, "lcv": False}),
+    ("random restarts", solve_with_restarts, {"seed": 1}),
+    ("min-conflicts", solve_with_constraint,
+     {"solver": "min_conflicts", "seed": 2}),
+    ("python-constraint", solve_with_constraint, {"solver": "backtracking"}),
+]
+
+
+def run_strategy(task):
+    """Runs one strategy (in a worker process) and times it."""
+    problem, (name, function, options) = task
+    start = time.perf_counter()
+    solution, complete, stats = function(problem, **options)
+    stats["seconds"] = time.perf_counter() - start
+    stats["status"] = "solved" if solution is not None else (
+        "no solution" if complete else "gave up"
+    )
+    return name, solution, complete, stats
+
+
+def solve_portfolio(problem, strategies=STRATEGIES, processes=None,
+                    timeout=None):
+    """Runs the strategies concurrently on a csp.CSP problem.
+
+    Returns (solution, winner, stats): the first solution found (None if
+    a complete strategy proved there is none, or nothing answered within
+    timeout seconds), the strategy that found it and each strategy's
+    statistics. The remaining workers are terminated as soon as there is
+    an answer.
+    """
+    start = time.perf_counter()
+    if processes is None:
+        processes = len(strategies)
+    stats = {}
+    solution, winner = None, None
+
+    with Pool(processes) as pool:
+        results = pool.imap_unordered(
+            run_strategy, [(problem, strategy) for strategy in strategies]
+        )
+        for _ in strategies:
+            remaining = None
+            if timeout is not None:
+                remaining = max(0, timeout - (time.perf_counter() - start))
+            try:
+                name, result, complete, strategy_stats = results.next(remaining)
+            except TimeoutError:
+                break
+            stats[name] = strategy_stats
+            if result is not None or complete:
+                solution, winner = result, name
+                break
+
+    # Leaving the pool terminated the strategies still running
+    for name, function, options in strategies:
+        stats.setdefault(name, {"status": "cancelled"})
+    return solution, winner, stats
+
+
+if __name__ == "__main__":
+    problem = random_exam_problem(exams=300, slots=3, conflicts=600, seed=3)
+    solution, winner, stats = solve_portfolio(problem, timeout=60)
+    print("Winner:", winner, "solved" if solution else "no solution")
+    for name, strategy_stats in stats.items():
+        print(f"{name}: {strategy_stats}")
@@ -1,14 +1,9 @@
-from constraint import *
+from math import perm
 
-problem = Problem()
+from constraint import AllDifferentConstraint, Problem
 
-# Add variables
-problem.addVariables(
-    ["A", "B", "C", "D", "E", "F", "G"],
-    ["Monday", "Tuesday", "Wednesday"]
-)
-
-# Add constraints
+VARIABLES = ["A", "B", "C", "D", "E", "F", "G"]
+DAYS = ["Monday", "Tuesday", "Wednesday"]
 CONSTRAINTS = [
     ("A", "B"),
     ("A", "C"),
@@ -22,9 +17,189 @@ CONSTRAINTS = [
     ("E", "G"),
     ("F", "G")
 ]
-for x, y in CONSTRAINTS:
-    problem.addConstraint(lambda x, y: x != y, (x, y))
 
-# Solve problem
-for solution in problem.getSolutions():
-    print(solution)
+
+def neighbor_sets(variables, constraints):
+    """Maps each variable to the variables it must differ from."""
+    neighbors = {var: set() for var in variables}
+    for x, y in constraints:
+        if x != y:
+            neighbors[x].add(y)
+            neighbors[y].add(x)
+    return neighbors
+
+
+def grow_clique(clique, neighbors):
+    """Extends a clique with common neighbors, highest degree first."""
+    clique = list(clique)
+    candidates = set.intersection(*(neighbors[var] for var in clique))
+    while candidates:
+        var = max(sorted(candidates), key=lambda v: len(neighbors[v]))
+        clique.append(var)
+        candidates &= neighbors[var]
+    return clique
+
+
+def clique_cover(variables, constraints):
+    """Groups the constraints into cliques, each one AllDifferent."""
+    neighbors = neighbor_sets(variables, constraints)
+    covered = set()
+    cliques = []
+    for x, y in constraints:
+        if x == y or frozenset((x, y)) in covered:
+            continue
+        clique = grow_clique([x, y], neighbors)
+        cliques.append(clique)
+        covered.update(
+            frozenset((a, b)) for a in clique for b in clique if a != b
+        )
+    return cliques
+
+
+def symmetry_clique(variables, constraints, days):
+    """Returns exams that must all get different days (a clique of at
+    most len(days) exams), to be fixed to the first days."""
+    neighbors = neighbor_sets(variables, constraints)
+    if not variables:
+        return []
+    start = max(variables, key=lambda var: len(neighbors[var]))
+    return grow_clique([start], neighbors)[:len(days)]
+
+
+def build_problem(variables=VARIABLES, days=DAYS, constraints=CONSTRAINTS,
+                  symmetry_breaking=True):
+    """Builds the exam-scheduling problem.
+
+    Every constraint is covered by a built-in AllDifferentConstraint over
+    a clique of conflicting exams. With symmetry_breaking, the days are
+    treated as interchangeable: the exams of one clique are fixed to the
+    first days, so each solution stands for every relabelling of its
+    days. Returns the problem and that number of relabellings.
+    """
+    problem = Problem()
+    fixed = {}
+    if symmetry_breaking:
+        clique = symmetry_clique(variables, constraints, days)
+        fixed = dict(zip(clique, days))
+
+    # Add variables
+    for var in variables:
+        problem.addVariable(var, [fixed[var]] if var in fixed else list(days))
+
+    # Add constraints
+    for clique in clique_cover(variables, constraints):
+        problem.addConstraint(AllDifferentConstraint(), clique)
+
+    return problem, perm(len(days), len(fixed))
+
+
+def iter_solutions(variables=VARIABLES, days=DAYS, constraints=CONSTRAINTS,
+                   symmetry_breaking=False):
+    """Yields the solutions one at a time, without building a list.
+
+    With symmetry_breaking, only one solution per relabelling of the
+    days is yielded.
+    """
+    problem, _ = build_problem(variables, days, constraints, symmetry_breaking)
+    yield from problem.getSolutionIter()
+
+
+def count_solutions(variables=VARIABLES, days=DAYS, constraints=CONSTRAINTS,
+                    symmetry_breaking=True):
+    """Counts the solutions without building any of them.
+
+    Domains are bitmasks. The unassigned exams are split into
+    independent groups (counts multiply), each group's count is cached
+    by its exams and remaining domains, and each branch forward-checks
+    the neighbors. With symmetry_breaking, one clique per group of
+    conflicting exams is fixed to the first days and the count is
+    multiplied back by the number of relabellings.
+    """
+    index = {var: i for i, var in enumerate(variables)}
+    neighbors = [set() for var in variables]
+    for x, y in constraints:
+        if x != y:
+            neighbors[index[x]].add(index[y])
+            neighbors[index[y]].add(index[x])
+    domains = [(1 << len(days)) - 1] * len(variables)
+    cache = {}
+
+    def components(group):
+        """Splits exams into groups with no constraints between them."""
+        remaining = set(group)
+        while remaining:
+            start = remaining.pop()
+            component = [start]
+            frontier = [start]
+            while frontier:
+                var = frontier.pop()
+                for neighbor in neighbors[var]:
+                    if neighbor in remaining:
+                        remaining.remove(neighbor)
+                        component.append(neighbor)
+                        frontier.append(neighbor)
+            yield component
+
+    def count(group):
+        """Counts the assignments of a connected group of exams."""
+        if len(group) == 1:
+            return domains[group[0]].bit_count()
+        key = tuple(sorted((var, domains[var]) for var in group))
+        if key in cache:
+            return cache[key]
+
+        # Branch on the exam with the fewest days left, then most neighbors
+        members = set(group)
+        var = min(group, key=lambda v: (domains[v].bit_count(),
+                                        -len(neighbors[v] & members)))
+        rest = [v for v in group if v != var]
+        linked = [v for v in neighbors[var] if v in members]
+        total = 0
+        values = domains[var]
+        while values:
+            value = values & -values
+            values ^= value
+
+            # Forward checking
+            pruned = [v for v in linked if domains[v] & value]
+            for v in pruned:
+                domains[v] ^= value
+            if all(domains[v] for v in pruned):
+                subtotal = 1
+                for component in components(rest):
+                    subtotal *= count(component)
+                    if not subtotal:
+                        break
+                total += subtotal
+            for v in pruned:
+                domains[v] |= value
+
+        cache[key] = total
+        return total
+
+    total = 1
+    for component in components(range(len(variables))):
+        multiplier = 1
+        if symmetry_breaking:
+            names = [variables[var] for var in component]
+            clique = symmetry_clique(
+                names,
+                [(variables[x], variables[y])
+                 for x in component for y in neighbors[x]],
+                days
+            )
+            for day, var in enumerate(clique):
+                domains[index[var]] = 1 << day
+            multiplier = perm(len(days), len(clique))
+        total *= count(component) * multiplier
+        if not total:
+            break
+    return total
+
+
+if __name__ == "__main__":
+
+    # Solve problem, printing each solution as it is found
+    for solution in iter_solutions():
+        print(solution)
+    print("Solutions:", count_solutions())
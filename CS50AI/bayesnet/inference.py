@@ -6,10 +6,10 @@ predictions = model.predict_proba({
 })
 
 # Print predictions for each node
-for node, prediction in zip(model.states, predictions):
+for node, prediction in zip(model.nodes, predictions):
     if isinstance(prediction, str):
-        print(f"{node.name}: {prediction}")
+        print(f"{node}: {prediction}")
     else:
-        print(f"{node.name}")
-        for value, probability in prediction.parameters[0].items():
+        print(f"{node}")
+        for value, probability in prediction.items():
             print(f"    {value}: {probability:.4f}")
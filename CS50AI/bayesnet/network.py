@@ -0,0 +1,206 @@
+"""
+Exact inference for discrete Bayesian networks by variable elimination.
+
+Each node's probability table is compiled into a NumPy factor (one axis
+per parent and one for the node). Queries multiply and sum out factors
+with numpy.einsum, eliminating variables in a min-fill order that is
+cached per query shape.
+"""
+
+import random
+
+import numpy as np
+
+
+class Factor():
+    """A table of nonnegative values over some variables (one axis each)."""
+
+    def __init__(self, variables, values):
+        self.variables = tuple(variables)
+        self.values = values
+
+    def reduce(self, evidence, index):
+        """Fixes the observed variables, dropping their axes."""
+        if not any(var in evidence for var in self.variables):
+            return self
+        key = tuple(
+            index[var][evidence[var]] if var in evidence else slice(None)
+            for var in self.variables
+        )
+        variables = [var for var in self.variables if var not in evidence]
+        return Factor(variables, self.values[key])
+
+
+def multiply(factors, keep):
+    """Multiplies factors and sums out every variable not in keep."""
+    if not factors:
+        return Factor((), np.array(1.0))
+    variables = sorted(set(var for factor in factors for var in factor.variables))
+    ids = {var: i for i, var in enumerate(variables)}
+    operands = []
+    for factor in factors:
+        operands.append(factor.values)
+        operands.append([ids[var] for var in factor.variables])
+    output = [var for var in variables if var in keep]
+    values = np.einsum(*operands, [ids[var] for var in output])
+    return Factor(output, values)
+
+
+class BayesianNetwork():
+
+    def __init__(self):
+        self.nodes = []
+        self.parents = {}
+        self.states = {}
+        self.index = {}
+        self.factors = {}
+        self.orders = {}
+
+    def add_node(self, name, table, parents=()):
+        """Adds a node, after its parents.
+
+        A root node's table maps each value to its probability. A child
+        node's table lists rows [parent values..., value, probability],
+        in the order of parents (as pomegranate's ConditionalProbabilityTable).
+        """
+        parents = tuple(parents)
+        if isinstance(table, dict):
+            table = [[value, probability] for value, probability in table.items()]
+
+        # States in order of first appearance
+        states = list(dict.fromkeys(row[-2] for row in table))
+        self.nodes.append(name)
+        self.parents[name] = parents
+        self.states[name] = states
+        self.index[name] = {state: i for i, state in enumerate(states)}
+
+        # Compile the table into an array with one axis per parent, then the node
+        values = np.zeros([len(self.states[parent]) for parent in parents] + [len(states)])
+        for row in table:
+            key = tuple(
+                self.index[var][value]
+                for var, value in zip(parents + (name,), row[:-1])
+            )
+            values[key] = row[-1]
+        self.factors[name] = Factor(parents + (name,), values)
+        self.orders.clear()
+
+    def probability(self, observations):
+        """Returns the probability of each observation, a list of values
+        in node order (None where a value is not observed)."""
+        probabilities = []
+        for observation in observations:
+            evidence = {
+                name: value for name, value in zip(self.nodes, observation)
+                if value is not None
+            }
+            if len(evidence) == len(self.nodes):
+                probability = 1.0
+                for name in self.nodes:
+                    factor = self.factors[name]
+                    key = tuple(self.index[var][evidence[var]] for var in factor.variables)
+                    probability *= factor.values[key]
+            else:
+                probability = float(self.eliminate((), evidence).values)
+            probabilities.append(probability)
+        return np.array(probabilities)
+
+    def query(self, variables, evidence=None):
+        """Returns the distribution of variables given evidence as a Factor
+        (axes in the order of variables, values summing to 1)."""
+        evidence = evidence or {}
+        factor = self.eliminate(tuple(variables), evidence)
+        axes = [factor.variables.index(var) for var in variables]
+        values = np.transpose(factor.values, axes)
+        return Factor(variables, values / values.sum())
+
+    def predict_proba(self, evidence=None):
+        """Returns, in node order, the observed value of each observed node
+        and a {value: probability} dict for each other node."""
+        evidence = evidence or {}
+        predictions = []
+        for name in self.nodes:
+            if name in evidence:
+                predictions.append(evidence[name])
+            else:
+                values = self.query([name], evidence).values
+                predictions.append(dict(zip(self.states[name], values.tolist())))
+        return predictions
+
+    def eliminate(self, variables, evidence):
+        """Sums every variable but variables out of the product of the
+        factors, with the evidence fixed (unnormalized)."""
+        relevant = self.ancestors(set(variables) | set(evidence))
+        factors = [
+            self.factors[name].reduce(evidence, self.index)
+            for name in self.nodes if name in relevant
+        ]
+
+        for var in self.elimination_order(tuple(variables), frozenset(evidence)):
+            involved = [factor for factor in factors if var in factor.variables]
+            if not involved:
+                continue
+            factors = [factor for factor in factors if var not in factor.variables]
+            keep = set(v for factor in involved for v in factor.variables) - {var}
+            factors.append(multiply(involved, keep))
+
+        return multiply(factors, set(variables))
+
+    def ancestors(self, names):
+        """Returns names and their ancestors; other nodes sum out to 1."""
+        result = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in result:
+                result.add(name)
+                stack.extend(self.parents[name])
+        return result
+
+    def elimination_order(self, variables, observed):
+        """Returns the order in which to sum out the hidden variables,
+        greedily picking the one adding the fewest edges between the
+        remaining variables (min-fill). Cached per query and observed set."""
+        key = (variables, observed)
+        if key in self.orders:
+            return self.orders[key]
+
+        relevant = self.ancestors(set(variables) | set(observed))
+        hidden = [name for name in self.nodes
+                  if name in relevant and name not in variables and name not in observed]
+
+        # Interaction graph of the unobserved variables
+        graph = {name: set() for name in relevant if name not in observed}
+        for name in relevant:
+            family = [var for var in self.factors[name].variables if var not in observed]
+            for var in family:
+                graph[var].update(v for v in family if v != var)
+
+        def fill(var):
+            neighbors = list(graph[var])
+            return sum(
+                1 for i, a in enumerate(neighbors) for b in neighbors[i + 1:]
+                if b not in graph[a]
+            )
+
+        order = []
+        while hidden:
+            var = min(hidden, key=fill)
+            hidden.remove(var)
+            order.append(var)
+            neighbors = graph.pop(var)
+            for a in neighbors:
+                graph[a].discard(var)
+                graph[a].update(neighbors - {a})
+
+        self.orders[key] = order
+        return order
+
+    def sample(self, rng=random):
+        """Draws one sample of every node, parents first."""
+        sample = {}
+        for name in self.nodes:
+            factor = self.factors[name]
+            key = tuple(self.index[parent][sample[parent]] for parent in self.parents[name])
+            sample[name] = rng.choices(self.states[name], weights=factor.values[key])[0]
+        return sample